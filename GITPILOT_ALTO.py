@@ -4,106 +4,3144 @@
 AUTOR: JOÃO VITOR SANTANA
 """
 
+import time
+STARTUP_T0 = time.perf_counter()  # Referencia para --startup-time
+
 import subprocess
 import sys
-import time
 import threading
 import os
 import re
 import json
+import select
+import struct
+import stat
+import signal
+import ctypes
+import ctypes.util
+import shutil
+import tempfile
+import uuid
+import hashlib
+import fnmatch
+import shlex
+import importlib.util
+import queue
+import logging
+import logging.handlers
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from urllib.parse import urlparse
+asyncio = None  # importado sob demanda pelo AsyncJobEngine
 
 # Configurar encoding para Windows
 if sys.platform.startswith('win'):
     os.environ['PYTHONIOENCODING'] = 'utf-8'
 
+# Arquivos de estado do GitPilot (histórico, métricas, caches, log): por usuário, nunca na pasta atual,
+# que costuma ser o projeto sendo publicado (entrariam no commit)
+GITPILOT_HOME = os.environ.get('GITPILOT_HOME') or os.path.join(os.path.expanduser('~'), '.gitpilot')
+
+def ensure_gitpilot_home():
+    """Cria a pasta de estado antes de gravar nela"""
+    try:
+        os.makedirs(GITPILOT_HOME, exist_ok=True)
+    except OSError:
+        pass
+
+# Dependencias do modo Git Bash, carregadas sob demanda (load_gui_automation)
+pyautogui = None
+pyperclip = None
+DEPS_CACHE_FILE = os.path.join(GITPILOT_HOME, "gitpilot_deps.json")
+
+def load_deps_cache():
+    """Lê o resultado das instalações já tentadas, por interpretador"""
+    try:
+        with open(DEPS_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get(sys.executable, {})
+    except (OSError, ValueError):
+        return {}
+
+def save_deps_cache(results):
+    """Grava o resultado das instalações para não repetir o pip a cada início"""
+    try:
+        with open(DEPS_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    cache[sys.executable] = results
+    ensure_gitpilot_home()
+    try:
+        with open(DEPS_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError:
+        pass
+
 # Auto-instalacao de dependencias
 def install_dependencies():
-    """Instala automaticamente todas as dependencias necessarias"""
+    """Instala as dependencias que faltam (uma única tentativa por interpretador)"""
     dependencies = ['pyautogui', 'pyperclip']
+    results = load_deps_cache()
     
     print("Verificando dependencias...")
     
     for package in dependencies:
-        try:
-            if package == 'pyautogui':
-                import pyautogui
-            elif package == 'pyperclip':
-                import pyperclip
+        if importlib.util.find_spec(package) is not None:
             print(f"✓ {package} ja instalado")
+            results[package] = 'ok'
+            continue
+        if results.get(package) == 'failed':
+            print(f"✗ {package}: instalação já falhou antes (apague {DEPS_CACHE_FILE} para tentar de novo)")
+            continue
+        print(f"Instalando {package}...")
+        try:
+            subprocess.check_call([sys.executable, '-m', 'pip', 'install', package])
+            print(f"✓ {package} instalado!")
+            results[package] = 'ok'
+        except Exception as e:
+            print(f"Erro ao instalar {package}: {e}")
+            results[package] = 'failed'
+            
+    save_deps_cache(results)
+    importlib.invalidate_caches()
+    return all(results.get(package) == 'ok' for package in dependencies)
+
+def load_gui_automation():
+    """Importa pyautogui/pyperclip só quando o modo Git Bash é usado"""
+    global pyautogui, pyperclip
+    if pyautogui is not None and pyperclip is not None:
+        return True
+    try:
+        import pyautogui as gui
+        import pyperclip as clip
+    except ImportError:
+        if not install_dependencies():
+            return False
+        try:
+            import pyautogui as gui
+            import pyperclip as clip
         except ImportError:
-            print(f"Instalando {package}...")
+            return False
+            
+    # Configuracoes do pyautogui CRUCIAIS
+    gui.FAILSAFE = True
+    gui.PAUSE = 0.1  # Pausa entre acoes
+    pyautogui, pyperclip = gui, clip
+    return True
+
+def find_bash():
+    """Localiza o bash (Git Bash no Windows) usado pelo backend subprocess"""
+    if sys.platform.startswith('win'):
+        # Preferir o bash do Git for Windows ao bash.exe do WSL em System32
+        bases = [
+            os.environ.get('ProgramFiles', r'C:\Program Files'),
+            os.environ.get('ProgramFiles(x86)', r'C:\Program Files (x86)'),
+            os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Programs'),
+        ]
+        for base in bases:
+            candidate = os.path.join(base, 'Git', 'bin', 'bash.exe')
+            if os.path.exists(candidate):
+                return candidate
+    return shutil.which('bash')
+
+# Log: linhas mantidas na tela, intervalo de atualizacao (ms) e arquivo rotativo
+LOG_MAX_LINES = 2000
+LOG_DRAIN_MS = 100
+LOG_FILE = os.path.join(GITPILOT_HOME, "gitpilot.log")
+LOG_FILE_MAX_BYTES = 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+# Tempo maximo (s) esperando o marcador de termino, por tipo de comando
+COMMAND_TIMEOUTS = [
+    ('git push', 300),
+    ('git pull', 300),
+    ('git fetch', 300),
+    ('git clone', 600),
+    ('git add', 120),
+    ('git commit', 60),
+    ('git remote add', 15),
+]
+DEFAULT_COMMAND_TIMEOUT = 30
+
+# Modo Git Bash sem marcadores: espera fixa por comando, +1s nos comandos mais lentos,
+# pausas de digitação por método (soma dos sleeps em type_command_*) e intervalo por caractere
+DEFAULT_COMMAND_DELAY = 2.5
+SLOW_COMMANDS = ('git remote add', 'git push', 'git commit')
+SLOW_COMMAND_EXTRA_DELAY = 1
+TYPING_PAUSES = {'clipboard': 0.6, 'direct': 0.5}
+TYPING_INTERVAL = 0.02
+
+def command_timeout(command):
+    """Retorna o timeout do comando conforme seu tipo"""
+    for keyword, timeout in COMMAND_TIMEOUTS:
+        if keyword in command:
+            return timeout
+    return DEFAULT_COMMAND_TIMEOUT
+
+def fixed_command_wait(command, delay=DEFAULT_COMMAND_DELAY):
+    """Espera fixa após o comando quando não há marcador de término"""
+    if any(keyword in command for keyword in SLOW_COMMANDS):
+        return delay + SLOW_COMMAND_EXTRA_DELAY
+    return delay
+
+def resolve_cd(command, cwd):
+    """Se o comando for um 'cd', retorna a nova pasta (None se não for 'cd')"""
+    cd_match = re.match(r'^cd\s+"?([^"]*?)"?\s*$', command.strip())
+    if not cd_match:
+        return None
+    target = os.path.expanduser(cd_match.group(1) or '~')
+    target = os.path.normpath(os.path.join(cwd or os.getcwd(), target))
+    if not os.path.isdir(target):
+        raise RuntimeError(f"Pasta não encontrada: {target}")
+    return target
+
+def compile_script(commands, marker_path):
+    """Gera um script bash com todos os comandos e um marcador de progresso por passo"""
+    lines = ['# Script gerado pelo Git Automatizador - um passo por comando']
+    total = len(commands)
+    for i, cmd in enumerate(commands, 1):
+        # Sem 'set -e': cada passo mantém sua semântica de '|| true' / '|| echo'
+        quoted = cmd.replace("'", "'\\''")
+        lines.append(f"echo '[{i}/{total}] {quoted}'")
+        lines.append(cmd)
+        lines.append(f'echo "GITPILOT_STEP {i} $?" >> "{marker_path}"')
+    return '\n'.join(lines) + '\n'
+
+# Painel de status: intervalo de verificacao de mudancas no .git (ms)
+STATUS_REFRESH_MS = 1000
+
+# Modo watch: segundos sem mudancas antes do auto-commit e intervalo do polling
+WATCH_QUIET_SECONDS = 5
+WATCH_POLL_SECONDS = 2
+# inotify: eventos observados (modify, attrib, close_write, moved_from/to, create, delete)
+IN_WATCH_MASK = 0x2 | 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200
+IN_CREATE = 0x100
+IN_MOVED_TO = 0x80
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+
+# Gerador de .gitignore: ecossistemas (arquivos marcadores na raiz, pastas geradas, padroes)
+GITIGNORE_ECOSYSTEMS = [
+    ('Python', ['requirements.txt', 'pyproject.toml', 'setup.py', 'setup.cfg', 'Pipfile', '*.py'],
+     ['__pycache__', '.pytest_cache', '.mypy_cache', '.ruff_cache', '.tox', '.ipynb_checkpoints',
+      '*.egg-info', 'dist', 'build', 'venv', '.venv'], ['*.py[cod]']),
+    ('Node', ['package.json'], ['node_modules', '.next', '.nuxt', 'coverage', 'dist'], ['npm-debug.log*', 'yarn-error.log*']),
+    ('Java', ['pom.xml', 'build.gradle', 'build.gradle.kts'], ['target', '.gradle', 'build'], ['*.class']),
+    ('Rust', ['Cargo.toml'], ['target'], []),
+    ('Go', ['go.mod'], [], ['*.exe', '*.test']),
+    ('.NET', ['*.csproj', '*.sln', '*.fsproj'], ['bin', 'obj', '.vs'], ['*.user']),
+    ('PHP', ['composer.json'], ['vendor'], []),
+    ('Ruby', ['Gemfile'], ['.bundle'], []),
+]
+GITIGNORE_COMMON = (['.idea', '.vscode'], ['.env', '*.log', '.DS_Store', 'Thumbs.db'])
+# Pastas grandes compostas quase só de dados viram sugestao de ignorar
+LARGE_DIR_BYTES = 100 * 1024 * 1024
+DATA_EXTENSIONS = {'.csv', '.tsv', '.parquet', '.h5', '.hdf5', '.npy', '.npz', '.pkl', '.pickle', '.zip',
+                   '.tar', '.gz', '.7z', '.rar', '.bin', '.pt', '.pth', '.ckpt', '.onnx', '.sqlite', '.db',
+                   '.mp4', '.avi', '.mov', '.wav', '.mp3', '.iso'}
+
+# Arquivos grandes: aviso e limite do host (GitHub: aviso em 50 MB, recusa acima de 100 MB)
+LARGE_FILE_WARN_MB = 50
+LARGE_FILE_LIMIT_MB = 100
+
+# Snapshot da arvore de trabalho (dentro do .git) para pular atualizacoes sem mudancas
+SNAPSHOT_FILE = "gitpilot_snapshot.json"
+
+# Atualizacao em lote: numero padrao de repositorios em paralelo
+BATCH_WORKERS = 8
+
+class CommandCancelled(RuntimeError):
+    """O comando foi interrompido pelo botão PARAR"""
+
+def process_group_options():
+    """Opções do Popen para o filho ficar em um grupo de processos próprio (para matar a árvore toda)"""
+    if sys.platform.startswith('win'):
+        return {'creationflags': getattr(subprocess, 'CREATE_NO_WINDOW', 0) | subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+def git_env():
+    """Ambiente dos processos git: sem pedir senha no terminal e com mensagens em inglês (LC_ALL=C),
+    pois o resultado é decidido por textos como 'nothing to commit', '[rejected]' e o progresso do push"""
+    return dict(os.environ, GIT_TERMINAL_PROMPT='0', LC_ALL='C')
+
+def start_shell(command, cwd, **options):
+    """Inicia a linha de comando no bash em um grupo de processos próprio"""
+    bash = find_bash()
+    return subprocess.Popen(
+        [bash, '-c', command] if bash else command,
+        shell=not bash,
+        cwd=cwd or None,
+        env=git_env(),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        **process_group_options(),
+        **options
+    )
+
+def signal_process_group(pid, force=False):
+    """SIGTERM (o git apaga os próprios .lock) ou SIGKILL no grupo; no Windows, taskkill na árvore"""
+    try:
+        if sys.platform.startswith('win'):
+            subprocess.run(['taskkill', '/T', '/F', '/PID', str(pid)], capture_output=True,
+                           creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+        else:
+            os.killpg(pid, signal.SIGKILL if force else signal.SIGTERM)
+    except OSError:
+        pass
+
+def kill_process_tree(proc, grace=0.3):
+    """Encerra o processo e todos os filhos (git, ssh, remote-https...)"""
+    if proc.poll() is not None:
+        return
+    signal_process_group(proc.pid)
+    try:
+        proc.wait(grace)
+    except subprocess.TimeoutExpired:
+        signal_process_group(proc.pid, force=True)
+
+def guard_process(proc, timeout=None, cancel_event=None):
+    """Vigia o processo: mata a árvore ao cancelar ou estourar o tempo.
+    Retorna stop(), que encerra a vigia e diz o motivo ('cancelado', 'timeout' ou None)"""
+    finished = threading.Event()
+    reason = []
+    
+    def watch():
+        deadline = time.time() + timeout if timeout else None
+        while not finished.wait(0.05):
+            if cancel_event is not None and cancel_event.is_set():
+                reason.append('cancelado')
+            elif deadline and time.time() > deadline:
+                reason.append('timeout')
+            else:
+                continue
+            kill_process_tree(proc)
+            return
+            
+    threading.Thread(target=watch, daemon=True).start()
+    
+    def stop():
+        finished.set()
+        return reason[0] if reason else None
+    return stop
+
+def locate_git_dir(folder):
+    """Diretório .git da pasta ou de uma pasta acima (None fora de um repositório)"""
+    folder = os.path.abspath(folder or '.')
+    while True:
+        dot_git = os.path.join(folder, '.git')
+        if os.path.isdir(dot_git):
+            return dot_git
+        if os.path.isfile(dot_git):
             try:
-                subprocess.check_call([sys.executable, '-m', 'pip', 'install', package])
-                print(f"✓ {package} instalado!")
-            except Exception as e:
-                print(f"Erro ao instalar {package}: {e}")
-
-# Executar instalacao
-install_dependencies()
-
-# Importacoes principais
-try:
-    import tkinter as tk
-    from tkinter import ttk, filedialog, messagebox, scrolledtext
-    import pyautogui
-    import pyperclip
-except ImportError as e:
-    print(f"ERRO ao importar: {e}")
-    print("Execute: pip install pyautogui pyperclip")
-    input("Pressione Enter para sair...")
-    sys.exit(1)
+                with open(dot_git, 'r', encoding='utf-8') as f:
+                    content = f.read().strip()
+            except OSError:
+                return None
+            if content.startswith('gitdir:'):
+                return os.path.normpath(os.path.join(folder, content[7:].strip()))
+            return None
+        parent = os.path.dirname(folder)
+        if parent == folder:
+            return None
+        folder = parent
+
+def git_lock_files(folder):
+    """Travas (.lock) presentes agora no repositório: {caminho: mtime}"""
+    git_dir = locate_git_dir(folder)
+    if not git_dir:
+        return {}
+    candidates = [os.path.join(git_dir, name) for name in ('index.lock', 'HEAD.lock', 'config.lock',
+                                                           'packed-refs.lock', 'shallow.lock')]
+    for dirpath, _, filenames in os.walk(os.path.join(git_dir, 'refs')):
+        candidates.extend(os.path.join(dirpath, name) for name in filenames if name.endswith('.lock'))
+    locks = {}
+    for path in candidates:
+        try:
+            locks[path] = os.stat(path).st_mtime
+        except OSError:
+            continue
+    return locks
+
+def remove_stale_locks(folder, since, before):
+    """Apaga só as travas deixadas pelo nosso git cancelado: ausentes em 'before' (tiradas logo antes
+    de iniciar o comando) e criadas depois de 'since'; travas de outros processos git ficam. Retorna as removidas"""
+    git_dir = locate_git_dir(folder)
+    removed = []
+    for path, mtime in git_lock_files(folder).items():
+        if path in before or mtime < since - 1:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        removed.append(os.path.relpath(path, git_dir))
+    return removed
+
+def run_shell(command, cwd, timeout=None, cancel_event=None):
+    """Executa uma linha de comando no bash (Git Bash no Windows) e captura a saída"""
+    proc = start_shell(command, cwd, text=True, encoding='utf-8', errors='replace')
+    stop = guard_process(proc, timeout, cancel_event)
+    try:
+        stdout, stderr = proc.communicate()
+    except BaseException:
+        # Ctrl+C no terminal não chega ao grupo do filho: encerrá-lo aqui
+        kill_process_tree(proc)
+        raise
+    finally:
+        reason = stop()
+    if reason == 'timeout':
+        raise subprocess.TimeoutExpired(command, timeout)
+    if reason == 'cancelado':
+        raise CommandCancelled(command)
+    return subprocess.CompletedProcess(command, proc.returncode, stdout, stderr)
+
+# Progresso de push/fetch (--progress): fases, objetos, bytes e vazão
+TRANSFER_METRICS_FILE = os.path.join(GITPILOT_HOME, "gitpilot_transfer.jsonl")
+TRANSFER_HISTORY_RUNS = 10
+PROGRESS_LINE = re.compile(
+    r'^(remote: )?([A-Z][a-z]+ (?:objects|deltas)):\s+(?:(\d+)% \((\d+)/(\d+)\)|(\d+))'
+    r'(?:, ([\d.]+) (bytes|KiB|MiB|GiB))?(?: \| ([\d.]+) (KiB|MiB|GiB)/s)?(, done|, completed with \d+ local objects?)?')
+SIZE_UNITS = {'bytes': 1, 'KiB': 1024, 'MiB': 1024 ** 2, 'GiB': 1024 ** 3}
+
+def is_transfer_command(command):
+    return bool(re.search(r'\bgit (push|fetch|pull|clone)\b', command)) and '--progress' in command
+
+class TransferProgress:
+    """Interpreta o progresso que o git escreve no stderr (linhas reescritas com \\r)"""
+    
+    def __init__(self, on_progress=None):
+        self.on_progress = on_progress
+        self.start = time.time()
+        # Cada fase começa quando a anterior termina (algumas só aparecem já concluídas)
+        self.mark = self.start
+        self.buffer = ''
+        self.phases = {}
+        self.lines = []
+        
+    def feed(self, text):
+        self.buffer += text
+        *pieces, self.buffer = re.split(r'[\r\n]', self.buffer)
+        for piece in pieces:
+            self.parse_line(piece.strip())
+            
+    def close(self):
+        self.parse_line(self.buffer.strip())
+        self.buffer = ''
+        
+    def parse_line(self, line):
+        if not line:
+            return
+        match = PROGRESS_LINE.match(line)
+        if not match:
+            self.lines.append(line)
+            return
+        remote, name, percent, done_count, total, count, size, unit, rate, rate_unit, done = match.groups()
+        name = f"remote {name}" if remote else name
+        now = time.time()
+        phase = self.phases.setdefault(name, {'started': self.mark, 'ended': None, 'objects': 0, 'percent': None})
+        phase['objects'] = int(total or count)
+        if size:
+            phase['bytes'] = int(float(size) * SIZE_UNITS[unit])
+        if rate:
+            phase['rate_bps'] = int(float(rate) * SIZE_UNITS[rate_unit])
+        # Algumas fases fecham com outro texto antes do ', done.' final
+        done = done or line.endswith(', done.')
+        percent = int(percent) if percent else (100 if done else None)
+        if done:
+            phase['ended'] = self.mark = now
+            self.lines.append(line)
+        if self.on_progress and percent is not None and percent != phase['percent']:
+            self.on_progress(name, percent)
+        phase['percent'] = percent
+        
+    def metrics(self):
+        """Resumo estruturado: objetos, bytes, vazão e duração de cada fase"""
+        end = time.time()
+        phases = {}
+        for name, phase in self.phases.items():
+            phases[name] = {'objects': phase['objects'],
+                            'seconds': round((phase['ended'] or end) - phase['started'], 3)}
+            if 'bytes' in phase:
+                phases[name]['bytes'] = phase['bytes']
+        transfer = self.phases.get('Writing objects') or self.phases.get('Receiving objects') or {}
+        size = transfer.get('bytes', 0)
+        seconds = ((transfer.get('ended') or end) - transfer['started']) if transfer else 0
+        return {
+            'seconds': round(end - self.start, 3),
+            'objects': transfer.get('objects', 0),
+            'bytes': size,
+            'throughput_bps': int(size / seconds) if seconds > 0.05 else transfer.get('rate_bps', 0),
+            'phases': phases,
+        }
+
+def run_transfer(command, cwd, timeout=None, on_progress=None, cancel_event=None):
+    """Como run_shell, mas lê o stderr ao vivo para acompanhar o progresso; retorna (resultado, métricas)"""
+    proc = start_shell(command, cwd)
+    progress = TransferProgress(on_progress)
+    stdout = []
+    reader = threading.Thread(target=lambda: stdout.append(proc.stdout.read()), daemon=True)
+    reader.start()
+    stop = guard_process(proc, timeout, cancel_event)
+    try:
+        while True:
+            chunk = os.read(proc.stderr.fileno(), 4096)
+            if not chunk:
+                break
+            progress.feed(chunk.decode('utf-8', errors='replace'))
+        proc.wait()
+        reader.join()
+    except BaseException:
+        kill_process_tree(proc)
+        raise
+    finally:
+        reason = stop()
+        proc.stdout.close()
+        proc.stderr.close()
+    progress.close()
+    if reason == 'timeout':
+        raise subprocess.TimeoutExpired(command, timeout)
+    if reason == 'cancelado':
+        raise CommandCancelled(command)
+    result = subprocess.CompletedProcess(command, proc.returncode,
+                                         (stdout[0] if stdout else b'').decode('utf-8', errors='replace'),
+                                         '\n'.join(progress.lines))
+    return result, progress.metrics()
+
+def save_transfer_metrics(folder, command, returncode, metrics):
+    """Acrescenta a execução ao histórico (uma linha JSON por push/fetch)"""
+    record = dict(metrics, time=time.strftime('%Y-%m-%dT%H:%M:%S'), repo=os.path.abspath(folder or '.'),
+                  command=command, returncode=returncode)
+    ensure_gitpilot_home()
+    try:
+        with open(TRANSFER_METRICS_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except OSError:
+        pass
+
+def transfer_baseline(folder, runs=TRANSFER_HISTORY_RUNS):
+    """Média de segundos das últimas execuções bem-sucedidas do repositório (None sem histórico)"""
+    folder = os.path.abspath(folder or '.')
+    seconds = []
+    try:
+        with open(TRANSFER_METRICS_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('repo') == folder and record.get('returncode') == 0:
+                    seconds.append(record['seconds'])
+    except OSError:
+        return None
+    recent = seconds[-runs:]
+    return sum(recent) / len(recent) if recent else None
+
+def format_transfer_metrics(metrics):
+    phases = ', '.join(f"{name.lower()} {phase['seconds']:.1f}s" for name, phase in metrics['phases'].items())
+    return (f"{metrics['objects']} objetos, {format_size(metrics['bytes'])} em {metrics['seconds']:.1f}s "
+            f"({format_size(metrics['throughput_bps'])}/s) | {phases}")
+
+# Histórico de execução: uma linha JSON por comando (alimenta a aba Desempenho)
+HISTORY_FILE = os.path.join(GITPILOT_HOME, "gitpilot_history.jsonl")
+HISTORY_PERIODS = {'Tudo': None, '30 dias': 30 * 86400, '7 dias': 7 * 86400, '24 horas': 86400}
+history_lock = threading.Lock()
+
+# Opções globais do git que consomem o argumento seguinte (git -C "/a b" push)
+GIT_OPTIONS_WITH_VALUE = ('-C', '-c', '--git-dir', '--work-tree', '--namespace', '--super-prefix', '--config-env')
+
+def command_kind(command):
+    """Tipo do comando para agrupar tempos: subcomando do git (add, commit, push...) ou o programa"""
+    try:
+        words = shlex.split(command)
+    except ValueError:  # aspas sem fechar
+        words = command.split()
+    if 'git' in words:
+        args = iter(words[words.index('git') + 1:])
+        for word in args:
+            if word in GIT_OPTIONS_WITH_VALUE:
+                next(args, None)
+            elif not word.startswith('-'):
+                return word
+    return words[0] if words else 'shell'
+
+def record_command(command, seconds, returncode, repo, backend, cancelled=False):
+    """Acrescenta a execução ao histórico (returncode None = não verificado, modo Git Bash)"""
+    record = {'time': time.time(), 'kind': command_kind(command), 'command': command,
+              'seconds': round(seconds, 3), 'returncode': returncode,
+              'repo': os.path.abspath(repo) if repo else '', 'backend': backend}
+    if cancelled:
+        record['cancelled'] = True
+    ensure_gitpilot_home()
+    try:
+        with history_lock, open(HISTORY_FILE, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except OSError:
+        pass
+
+def load_history(since=None):
+    """Lê o histórico (só registros a partir de 'since', em epoch)"""
+    records = []
+    try:
+        with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if since is None or record.get('time', 0) >= since:
+                    records.append(record)
+    except OSError:
+        pass
+    return records
+
+def percentile(values, pct):
+    """Percentil por posição mais próxima (values já ordenados)"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(pct / 100 * len(values))) - 1))]
+
+def latency_report(records, group='kind'):
+    """[(grupo, n, p50, p95, max, falhas)] ordenado do mais lento (p95) para o mais rápido"""
+    groups = {}
+    for record in records:
+        groups.setdefault(record.get(group) or '?', []).append(record)
+    report = []
+    for key, items in groups.items():
+        seconds = sorted(item['seconds'] for item in items)
+        failures = sum(1 for item in items if item.get('returncode') not in (0, None))
+        report.append((key, len(items), percentile(seconds, 50), percentile(seconds, 95), seconds[-1], failures))
+    report.sort(key=lambda row: row[3], reverse=True)
+    return report
+
+def run_commands(commands, cwd=None, on_step=None, parallel_stage=False):
+    """Executa a lista em sequência (backend subprocess sem interface); retorna os passos.
+    Passos de plano (PlanStep) são conferidos agora, contra o repositório como está na hora de rodar"""
+    steps = []
+    if any(isinstance(cmd, PlanStep) for cmd in commands):
+        commands, skipped = resolve_plan(commands, probe_repo_state(cwd))
+        steps.extend({'command': cmd, 'skipped': reason} for cmd, reason in skipped)
+    for i, cmd in enumerate(commands, 1):
+        start = time.time()
+        step = {'step': i, 'command': cmd, 'returncode': 0, 'stdout': '', 'stderr': ''}
+        try:
+            target = resolve_cd(cmd, cwd)
+            if target:
+                cwd = target
+            elif parallel_stage and cmd.strip() == 'git add .':
+                step['stage'] = stage_parallel(cwd)
+            elif is_transfer_command(cmd):
+                result, metrics = run_transfer(cmd, cwd, timeout=command_timeout(cmd))
+                step.update(returncode=result.returncode, stdout=result.stdout, stderr=result.stderr,
+                            transfer=metrics)
+                save_transfer_metrics(cwd, cmd, result.returncode, metrics)
+            else:
+                result = run_shell(cmd, cwd, timeout=command_timeout(cmd))
+                step.update(returncode=result.returncode, stdout=result.stdout, stderr=result.stderr)
+        except RuntimeError as e:
+            step.update(returncode=-1, stderr=str(e))
+        except subprocess.TimeoutExpired:
+            step.update(returncode=-1, stderr=f"timeout de {command_timeout(cmd)}s")
+        step['seconds'] = round(time.time() - start, 3)
+        record_command(cmd, step['seconds'], step['returncode'], cwd, 'cli')
+        steps.append(step)
+        if on_step:
+            on_step(step)
+        if step['returncode'] == -1 and cmd.strip().startswith('cd '):
+            break  # sem a pasta certa os próximos comandos rodariam no lugar errado
+    return steps
+
+def run_git(args, cwd, timeout=None, cancel_event=None):
+    """Executa git (sem shell) na pasta e retorna o CompletedProcess. Com cancel_event (jobs da fila),
+    o processo fica em grupo próprio: PARAR o encerra, apaga as travas que ele deixou e levanta CommandCancelled"""
+    command = ['git'] + list(args)
+    options = dict(cwd=cwd, env=git_env(), stdin=subprocess.DEVNULL,
+                   text=True, encoding='utf-8', errors='replace')
+    if cancel_event is None:
+        return subprocess.run(command, capture_output=True, timeout=timeout,
+                              creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0), **options)
+    locks = git_lock_files(cwd)
+    start = time.time()
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            **process_group_options(), **options)
+    stop = guard_process(proc, timeout, cancel_event)
+    try:
+        stdout, stderr = proc.communicate()
+    except BaseException:
+        kill_process_tree(proc)
+        raise
+    finally:
+        reason = stop()
+    if reason == 'timeout':
+        raise subprocess.TimeoutExpired(command, timeout)
+    if reason == 'cancelado':
+        remove_stale_locks(cwd, start, locks)
+        raise CommandCancelled(' '.join(command))
+    return subprocess.CompletedProcess(command, proc.returncode, stdout, stderr)
+
+# Staging em lotes: blobs calculados em paralelo, indice atualizado de uma vez, retomavel
+STAGE_CHUNK_FILES = 1000
+STAGE_JOURNAL_FILE = "gitpilot_stage.jsonl"
+
+def run_git_input(args, cwd, data, cancel_event=None):
+    """Executa git enviando 'data' no stdin (processo em grupo próprio, interrompível)"""
+    proc = subprocess.Popen(['git'] + list(args), cwd=cwd, env=git_env(),
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            **process_group_options())
+    stop = guard_process(proc, None, cancel_event)
+    try:
+        stdout, stderr = proc.communicate(data.encode('utf-8'))
+    finally:
+        reason = stop()
+    if reason == 'cancelado':
+        raise CommandCancelled('git ' + ' '.join(args))
+    if proc.returncode != 0:
+        raise RuntimeError(stderr.decode('utf-8', errors='replace').strip() or f"git {args[0]}: código {proc.returncode}")
+    return stdout.decode('utf-8', errors='replace')
+
+def list_unstaged(folder):
+    """O que 'git add .' levaria: novos (respeitando o .gitignore), modificados e apagados"""
+    result = run_git(['ls-files', '-z', '--others', '--modified', '--deleted', '--exclude-standard'], folder,
+                     timeout=command_timeout('git add'))
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return sorted({path for path in result.stdout.split('\0') if path})
+
+def stage_parallel(folder, workers=None, chunk_size=STAGE_CHUNK_FILES, on_progress=None, cancel_event=None):
+    """'git add .' em lotes: 'hash-object -w --stdin-paths' em paralelo e um único 'update-index --index-info'.
+    Cada lote pronto vai para um diário em .git; depois de uma interrupção os arquivos iguais não são refeitos.
+    on_progress(arquivos, total, bytes, total_bytes, segundos). Retorna o resumo (dict)"""
+    start = time.time()
+    folder = folder or '.'
+    git_dir = run_git(['rev-parse', '--git-dir'], folder).stdout.strip()
+    if not git_dir:
+        raise RuntimeError(f"Não é um repositório git: {folder}")
+    journal_path = os.path.join(folder, git_dir, STAGE_JOURNAL_FILE)
+    filemode = run_git(['config', '--bool', 'core.filemode'], folder).stdout.strip() != 'false'
+    
+    # Diário de uma execução interrompida: caminho -> (tamanho, mtime, modo, sha)
+    journal = {}
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # última linha cortada pela interrupção
+                journal[record['p']] = (record['s'], record['m'], record['mode'], record['h'])
+    except OSError:
+        pass
+        
+    index_modes = {}
+    if not filemode:
+        # Sem bit de execução confiável (Windows): manter o modo que já está no índice
+        for entry in run_git(['ls-files', '-s', '-z'], folder).stdout.split('\0'):
+            info, _, path = entry.partition('\t')
+            if path:
+                index_modes[path] = info.split()[0]
+                
+    entries, removed, fallback, pending = [], [], [], []
+    resumed = 0
+    for path in list_unstaged(folder):
+        try:
+            st = os.lstat(os.path.join(folder, path))
+        except FileNotFoundError:
+            removed.append(path)
+            continue
+        if not stat.S_ISREG(st.st_mode) or '\n' in path:
+            fallback.append(path)  # links, repositórios aninhados: ficam com o git add
+            continue
+        if filemode:
+            mode = '100755' if st.st_mode & 0o111 else '100644'
+        else:
+            mode = index_modes.get(path, '100644')
+        previous = journal.get(path)
+        if previous and previous[:3] == (st.st_size, st.st_mtime_ns, mode):
+            entries.append(f"{mode} {previous[3]}\t{path}")
+            resumed += 1
+        else:
+            pending.append((path, st.st_size, st.st_mtime_ns, mode))
+            
+    total_files = len(pending)
+    total_bytes = sum(item[1] for item in pending)
+    done_files = done_bytes = 0
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+    with open(journal_path, 'a', encoding='utf-8') as journal_file, \
+            ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 4) as pool:
+        futures = {pool.submit(run_git_input, ['hash-object', '-w', '--stdin-paths'], folder,
+                               ''.join(item[0] + '\n' for item in chunk), cancel_event): chunk for chunk in chunks}
+        try:
+            for future in as_completed(futures):
+                chunk = futures[future]
+                shas = future.result().split()
+                for (path, size, mtime, mode), sha in zip(chunk, shas):
+                    entries.append(f"{mode} {sha}\t{path}")
+                    journal_file.write(json.dumps({'p': path, 's': size, 'm': mtime, 'mode': mode, 'h': sha},
+                                                  ensure_ascii=False) + '\n')
+                journal_file.flush()
+                done_files += len(chunk)
+                done_bytes += sum(item[1] for item in chunk)
+                if on_progress:
+                    on_progress(done_files, total_files, done_bytes, total_bytes, time.time() - start)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+            
+    if cancel_event is not None and cancel_event.is_set():
+        raise CommandCancelled('git add .')
+    if entries:
+        run_git_input(['update-index', '--add', '-z', '--index-info'], folder,
+                      ''.join(entry + '\0' for entry in entries))
+    if removed:
+        run_git_input(['update-index', '-z', '--force-remove', '--stdin'], folder,
+                      ''.join(path + '\0' for path in removed))
+    for i in range(0, len(fallback), 500):
+        add = run_git(['add', '--'] + fallback[i:i + 500], folder, timeout=command_timeout('git add'))
+        if add.returncode != 0:
+            raise RuntimeError(add.stderr.strip())
+    try:
+        os.remove(journal_path)
+    except OSError:
+        pass
+    return {'files': total_files, 'bytes': total_bytes, 'resumed': resumed, 'removed': len(removed),
+            'fallback': len(fallback), 'seconds': round(time.time() - start, 3)}
+
+def find_repositories(root, max_depth=3):
+    """Procura pastas com .git abaixo de root (sem entrar em repositórios achados)"""
+    found = []
+    pending = [(os.path.abspath(root), 0)]
+    while pending:
+        folder, depth = pending.pop()
+        if os.path.exists(os.path.join(folder, '.git')):
+            found.append(folder)
+            continue
+        if depth >= max_depth:
+            continue
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.'):
+                        pending.append((entry.path, depth + 1))
+        except OSError:
+            pass
+    return sorted(found)
+
+class IgnoreRules:
+    """Regras do .gitignore (padrões, '/', '**', '!') usadas na varredura da árvore"""
+    
+    def __init__(self, rules=None):
+        self.rules = list(rules or [])  # (base, regex, negar, só pasta)
+        
+    def extended(self, path, base=''):
+        """Nova instância com as regras de mais um arquivo (.gitignore de subpasta)"""
+        child = IgnoreRules(self.rules)
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return self
+        for line in lines:
+            line = line.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            pattern = line.strip('/')
+            if not pattern:
+                continue
+            anchored = line.startswith('/') or '/' in pattern
+            child.rules.append((base, self.compile(pattern, anchored), negate, dir_only))
+        return child
+        
+    @staticmethod
+    def compile(pattern, anchored):
+        """Converte o glob do .gitignore em regex ('*' não atravessa '/', '**' sim)"""
+        regex = ''
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**/', i):
+                regex += '(?:.*/)?'
+                i += 3
+            elif pattern.startswith('/**', i) and i + 3 == len(pattern):
+                regex += '(?:/.*)?'
+                i += 3
+            elif pattern[i] == '*':
+                regex += '[^/]*'
+                i += 1
+            elif pattern[i] == '?':
+                regex += '[^/]'
+                i += 1
+            elif pattern[i] == '[' and pattern.find(']', i + 2) > 0:
+                end = pattern.find(']', i + 2)
+                chars = pattern[i + 1:end]
+                regex += '[' + ('^' + chars[1:] if chars.startswith('!') else chars) + ']'
+                i = end + 1
+            else:
+                regex += re.escape(pattern[i])
+                i += 1
+        return re.compile(('' if anchored else '(?:.*/)?') + regex + r'\Z')
+        
+    def ignored(self, relpath, is_dir):
+        result = False
+        for base, regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if base:
+                if not relpath.startswith(base + '/'):
+                    continue
+                relpath_in_base = relpath[len(base) + 1:]
+            else:
+                relpath_in_base = relpath
+            if regex.match(relpath_in_base):
+                result = not negate
+        return result
+
+def directory_ignore_rules(folder, rel='', inherited=None):
+    """Regras válidas dentro da subpasta 'rel': as herdadas mais o .gitignore dela
+    (na raiz: .git/info/exclude + .gitignore)"""
+    if not rel:
+        rules = IgnoreRules().extended(os.path.join(folder, '.git', 'info', 'exclude'))
+        return rules.extended(os.path.join(folder, '.gitignore'))
+    return inherited.extended(os.path.join(folder, rel, '.gitignore'), rel)
+
+def scan_tree(folder, max_workers=8):
+    """Varre a árvore em paralelo (uma thread por subpasta do topo) respeitando .gitignore
+    
+    Retorna {caminho relativo: (tamanho, mtime_ns, inode)}.
+    """
+    folder = os.path.abspath(folder)
+    rules = directory_ignore_rules(folder)
+    
+    def walk(start_rel, start_rules):
+        found = {}
+        pending = [(start_rel, start_rules)]
+        while pending:
+            rel, dir_rules = pending.pop()
+            path = os.path.join(folder, rel) if rel else folder
+            dir_rules = directory_ignore_rules(folder, rel, dir_rules)
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.name == '.git':
+                            continue
+                        entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        if dir_rules.ignored(entry_rel, is_dir):
+                            continue
+                        if is_dir:
+                            pending.append((entry_rel, dir_rules))
+                        else:
+                            st = entry.stat(follow_symlinks=False)
+                            found[entry_rel] = (st.st_size, st.st_mtime_ns, st.st_ino)
+            except OSError:
+                pass
+        return found
+        
+    snapshot = {}
+    top_dirs = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name == '.git' or rules.ignored(entry.name, entry.is_dir(follow_symlinks=False)):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                top_dirs.append(entry.name)
+            else:
+                st = entry.stat(follow_symlinks=False)
+                snapshot[entry.name] = (st.st_size, st.st_mtime_ns, st.st_ino)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for found in pool.map(lambda name: walk(name, rules), top_dirs):
+            snapshot.update(found)
+    return snapshot
+
+def format_size(size):
+    """Bytes em texto legível"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+def propose_gitignore(folder, max_workers=8):
+    """Varre a pasta em paralelo e sugere regras de .gitignore com quanto cada uma exclui
+    
+    Retorna dict com 'ecosystems', 'rules' [(regra, motivo, arquivos, bytes)],
+    'total_files', 'total_bytes', 'excluded_files' e 'excluded_bytes'.
+    """
+    folder = os.path.abspath(folder)
+    root_names = os.listdir(folder)
+    ecosystems = [eco for eco in GITIGNORE_ECOSYSTEMS
+                  if any(fnmatch.filter(root_names, marker) for marker in eco[1])]
+    dir_rules = {name: 'editor/IDE' for name in GITIGNORE_COMMON[0]}
+    file_rules = {pattern: 'comum' for pattern in GITIGNORE_COMMON[1]}
+    for name, _, dirs, patterns in ecosystems:
+        for dir_name in dirs:
+            dir_rules.setdefault(dir_name, f"gerado ({name})")
+        for pattern in patterns:
+            file_rules.setdefault(pattern, name)
+            
+    def measure(path):
+        files, size = 0, 0
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                try:
+                    size += os.lstat(os.path.join(dirpath, filename)).st_size
+                    files += 1
+                except OSError:
+                    pass
+        return files, size
+        
+    def walk(start_rel):
+        """Retorna (pastas geradas achadas, arquivos mantidos [(rel, tamanho)])"""
+        generated = []
+        kept = []
+        pending = [start_rel]
+        while pending:
+            rel = pending.pop()
+            path = os.path.join(folder, rel)
+            # Ambiente virtual Python com qualquer nome
+            if os.path.exists(os.path.join(path, 'pyvenv.cfg')):
+                generated.append((rel, 'ambiente virtual Python') + measure(path))
+                continue
+            name = os.path.basename(rel)
+            rule = next((pattern for pattern in dir_rules if fnmatch.fnmatch(name, pattern)), None)
+            if rule:
+                generated.append((rel, dir_rules[rule]) + measure(path))
+                continue
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.name == '.git':
+                            continue
+                        entry_rel = f"{rel}/{entry.name}"
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry_rel)
+                        else:
+                            kept.append((entry_rel, entry.stat(follow_symlinks=False).st_size))
+            except OSError:
+                pass
+        return generated, kept
+        
+    generated = []
+    kept = []
+    top_dirs = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name == '.git':
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                top_dirs.append(entry.name)
+            else:
+                kept.append((entry.name, entry.stat(follow_symlinks=False).st_size))
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        for found, files in pool.map(walk, top_dirs):
+            generated.extend(found)
+            kept.extend(files)
+            
+    # Regras de pasta: por nome (em qualquer nível); venvs pelo caminho
+    rules = {}
+    for rel, reason, files, size in generated:
+        name = os.path.basename(rel)
+        rule = f"/{rel}/" if reason == 'ambiente virtual Python' else next(
+            pattern for pattern in dir_rules if fnmatch.fnmatch(name, pattern)) + '/'
+        entry = rules.setdefault(rule, [reason, 0, 0])
+        entry[1] += files
+        entry[2] += size
+        
+    # Regras de arquivo e pastas grandes de dados, sobre o que sobrou
+    dir_totals = {}
+    for rel, size in kept:
+        name = os.path.basename(rel)
+        pattern = next((p for p in file_rules if fnmatch.fnmatch(name, p)), None)
+        if pattern:
+            entry = rules.setdefault(pattern, [file_rules[pattern], 0, 0])
+            entry[1] += 1
+            entry[2] += size
+            continue
+        is_data = os.path.splitext(name)[1].lower() in DATA_EXTENSIONS
+        parent = os.path.dirname(rel)
+        while parent:
+            totals = dir_totals.setdefault(parent, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += size
+            totals[2] += size if is_data else 0
+            parent = os.path.dirname(parent)
+    for rel in sorted(dir_totals, key=lambda d: d.count('/')):
+        files, size, data_size = dir_totals[rel]
+        if size >= LARGE_DIR_BYTES and data_size >= size * 0.8:
+            if any(rel.startswith(rule.strip('/') + '/') for rule in rules if rule.startswith('/')):
+                continue
+            rules[f"/{rel}/"] = ['dados grandes', files, size]
+            
+    # Padrões do ecossistema e os comuns (segredos, SO, editores) entram mesmo sem nada a excluir ainda
+    for pattern, reason in dir_rules.items():
+        rules.setdefault(pattern + '/', [reason, 0, 0])
+    for pattern, reason in file_rules.items():
+        rules.setdefault(pattern, [reason, 0, 0])
+        
+    # As regras não se sobrepõem: a soma delas é o que fica fora do commit
+    return {
+        'ecosystems': [eco[0] for eco in ecosystems],
+        'rules': sorted(((rule, values[0], values[1], values[2]) for rule, values in rules.items()),
+                        key=lambda r: -r[3]),
+        'total_files': len(kept) + sum(g[2] for g in generated),
+        'total_bytes': sum(size for _, size in kept) + sum(g[3] for g in generated),
+        'excluded_files': sum(values[1] for values in rules.values()),
+        'excluded_bytes': sum(values[2] for values in rules.values()),
+    }
+
+def append_gitignore(folder, rules, comment):
+    """Acrescenta ao .gitignore as regras que ainda não existem; retorna as novas"""
+    path = os.path.join(folder, '.gitignore')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            existing = f.read()
+    except OSError:
+        existing = ''
+    present = {line.strip() for line in existing.splitlines()}
+    new_rules = [rule for rule in rules if rule not in present]
+    if new_rules:
+        with open(path, 'a', encoding='utf-8', newline='\n') as f:
+            if existing and not existing.endswith('\n'):
+                f.write('\n')
+            f.write(f"# {comment}\n")
+            f.write('\n'.join(new_rules) + '\n')
+    return new_rules
+
+def write_gitignore(folder, proposal):
+    """Acrescenta ao .gitignore as regras sugeridas pelo propose_gitignore"""
+    return append_gitignore(folder, [rule for rule, *_ in proposal['rules']],
+                            f"Gerado pelo Git Automatizador ({', '.join(proposal['ecosystems']) or 'genérico'})")
+
+def find_large_files(folder, threshold):
+    """Arquivos que 'git add .' enviaria (rastreados + novos não ignorados) acima de threshold bytes"""
+    if os.path.exists(os.path.join(folder, '.git')):
+        listing = run_git(['ls-files', '-z', '--cached', '--others', '--exclude-standard'], folder)
+        if listing.returncode != 0:
+            raise RuntimeError(listing.stderr.strip())
+        sizes = {}
+        for rel in filter(None, listing.stdout.split('\0')):
+            try:
+                sizes[rel] = os.lstat(os.path.join(folder, rel)).st_size
+            except OSError:
+                pass  # removido da árvore
+    else:
+        # Ainda sem 'git init': mesma visão pelo .gitignore
+        sizes = {rel: values[0] for rel, values in scan_tree(folder).items()}
+    return sorted(((rel, size) for rel, size in sizes.items() if size >= threshold), key=lambda item: -item[1])
+
+def large_file_commands(folder, paths, action, write=True):
+    """Comandos para mandar os arquivos pelo Git LFS ('lfs') ou tirá-los do commit ('gitignore')"""
+    if action == 'lfs':
+        commands = ['git lfs install --local']
+        commands.extend(f'git lfs track "{rel}"' for rel in paths)
+        return commands + ['git add .gitattributes']
+    # Caminho literal: escapar os curingas do .gitignore
+    rules = ['/' + re.sub(r'([\[\]*?!#\\])', r'\\\1', rel) for rel in paths]
+    if write:
+        append_gitignore(folder, rules, "Arquivos grandes (Git Automatizador)")
+    # Se já estavam no índice, tirar de lá (o arquivo continua no disco)
+    return [f'git rm --cached --ignore-unmatch -q -- "{rel}"' for rel in paths]
+
+def git_lfs_available(folder=None):
+    try:
+        return run_git(['lfs', 'version'], folder).returncode == 0
+    except OSError:
+        return False
+
+def format_gitignore_proposal(proposal):
+    """Texto do relatório do gerador de .gitignore"""
+    lines = [f"Ecossistemas: {', '.join(proposal['ecosystems']) or 'nenhum detectado'}",
+             f"Total na pasta: {proposal['total_files']} arquivos, {format_size(proposal['total_bytes'])}",
+             f"Excluídos pelas regras: {proposal['excluded_files']} arquivos, {format_size(proposal['excluded_bytes'])}",
+             ""]
+    for rule, reason, files, size in proposal['rules']:
+        lines.append(f"{rule:<28} {files:>8} arq. {format_size(size):>10}  ({reason})")
+    return '\n'.join(lines)
+
+def snapshot_file(folder):
+    """Snapshot fica dentro do .git (por repositório, nunca versionado)"""
+    return os.path.join(GitRepoReader(folder).git_dir, SNAPSHOT_FILE)
+
+def working_tree_changed(folder):
+    """Compara a árvore com o último snapshot salvo; retorna (mudou, snapshot atual)"""
+    current = scan_tree(folder)
+    try:
+        with open(snapshot_file(folder), 'r', encoding='utf-8') as f:
+            saved = {path: tuple(values) for path, values in json.load(f).items()}
+    except (OSError, ValueError):
+        return True, current
+    return saved != current, current
+
+def save_snapshot(folder, snapshot):
+    """Grava o snapshot após uma atualização bem-sucedida"""
+    path = snapshot_file(folder)
+    try:
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(path + '.tmp', path)
+    except OSError:
+        pass
+
+def branch_ahead(folder):
+    """True se o branch local tem commits que o upstream não tem (ou não há upstream)"""
+    status = get_repo_reader(folder).status(limit=0)
+    if not status['head']:
+        return False
+    if not status['upstream_head']:
+        return True
+    if status['head'] == status['upstream_head']:
+        return False
+    # HEAD ancestral do upstream = atrás ou igual, nada a enviar
+    check = run_git(['merge-base', '--is-ancestor', status['head'], status['upstream_head']], folder)
+    return check.returncode != 0
+
+class FolderWatcher:
+    """Observa a pasta (inotify no Linux, polling nos outros) e chama on_change
+    depois de um período sem mudanças; .git e caminhos dos .gitignore (raiz e subpastas) são ignorados."""
+    
+    def __init__(self, folder, on_change, quiet_period=WATCH_QUIET_SECONDS,
+                 poll_interval=WATCH_POLL_SECONDS, log=print):
+        self.folder = os.path.abspath(folder)
+        self.on_change = on_change
+        self.quiet_period = quiet_period
+        self.poll_interval = poll_interval
+        self.log = log
+        self.dir_rules = {}  # pasta observada -> regras válidas nela (mesmas de scan_tree)
+        self.stop_event = threading.Event()
+        self.last_change = None
+        self.mode = None
+        
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+        
+    def stop(self):
+        self.stop_event.set()
+        
+    def run(self):
+        if sys.platform.startswith('linux'):
+            try:
+                self.run_inotify()
+                return
+            except OSError as e:
+                self.log(f"⚠️ inotify indisponível ({e}), usando polling")
+        self.run_polling()
+        
+    def changed(self):
+        self.last_change = time.monotonic()
+        
+    def check_quiet(self):
+        """Dispara on_change quando a pasta fica quieta; se ele recusar (ocupado), espera outro período"""
+        if self.last_change is None or time.monotonic() - self.last_change < self.quiet_period:
+            return
+        if self.on_change():
+            self.last_change = None
+        else:
+            self.changed()
+            
+    def run_polling(self):
+        self.mode = 'polling'
+        self.log(f"👁️ Observando {self.folder} (polling a cada {self.poll_interval}s)")
+        previous = scan_tree(self.folder)
+        while not self.stop_event.wait(self.poll_interval):
+            current = scan_tree(self.folder)
+            if current != previous:
+                previous = current
+                self.changed()
+            self.check_quiet()
+            
+    def run_inotify(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+        watches = {}
+        
+        def add_tree(start_rel):
+            """Observa a subárvore (de novo, se um .gitignore mudou: o inotify reaproveita os watches)"""
+            pending = [(start_rel, self.dir_rules.get(start_rel.rpartition('/')[0]))]
+            while pending:
+                rel, rules = pending.pop()
+                rules = directory_ignore_rules(self.folder, rel, rules)
+                self.dir_rules[rel] = rules
+                path = os.path.join(self.folder, rel) if rel else self.folder
+                wd = libc.inotify_add_watch(fd, os.fsencode(path), IN_WATCH_MASK)
+                if wd < 0:
+                    error = ctypes.get_errno()
+                    if error == 28:  # ENOSPC: limite de watches do sistema
+                        raise OSError(error, 'limite de inotify watches atingido')
+                    continue
+                watches[wd] = rel
+                try:
+                    with os.scandir(path) as entries:
+                        for entry in entries:
+                            entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+                            if (entry.is_dir(follow_symlinks=False) and entry.name != '.git'
+                                    and not rules.ignored(entry_rel, True)):
+                                pending.append((entry_rel, rules))
+                except OSError:
+                    pass
+                    
+        try:
+            add_tree('')
+            self.mode = 'inotify'
+            self.log(f"👁️ Observando {self.folder} (inotify, {len(watches)} pastas)")
+            while not self.stop_event.is_set():
+                ready, _, _ = select.select([fd], [], [], 0.5)
+                if ready:
+                    try:
+                        data = os.read(fd, 64 * 1024)
+                    except BlockingIOError:
+                        data = b''
+                    offset = 0
+                    while offset + 16 <= len(data):
+                        wd, mask, _, length = struct.unpack_from('iIII', data, offset)
+                        name = os.fsdecode(data[offset + 16:offset + 16 + length].rstrip(b'\0'))
+                        offset += 16 + length
+                        if mask & IN_Q_OVERFLOW:
+                            self.changed()
+                            continue
+                        base = watches.get(wd)
+                        if base is None or not name:
+                            continue
+                        rel = f"{base}/{name}" if base else name
+                        is_dir = bool(mask & IN_ISDIR)
+                        if rel.split('/')[0] == '.git' or self.dir_rules[base].ignored(rel, is_dir):
+                            continue
+                        if name == '.gitignore':
+                            add_tree(base)
+                        elif is_dir and mask & (IN_CREATE | IN_MOVED_TO):
+                            add_tree(rel)
+                        self.changed()
+                self.check_quiet()
+        finally:
+            os.close(fd)
+
+def update_repository(folder, msg, skip_unchanged=True, cancel_event=None):
+    """git add . -> git commit -> git push em um repositório; retorna dict com o resultado"""
+    start = time.time()
+    result = {'repo': folder, 'status': 'falhou', 'detail': ''}
+    snapshot = None
+    try:
+        if skip_unchanged:
+            changed, snapshot = working_tree_changed(folder)
+            if not changed and not branch_ahead(folder):
+                result['status'] = 'nada para commitar'
+                return result
+                
+        add = run_git(['add', '.'], folder, timeout=command_timeout('git add'), cancel_event=cancel_event)
+        if add.returncode != 0:
+            result['detail'] = add.stderr.strip()
+            return result
+            
+        commit = run_git(['commit', '-m', msg], folder, timeout=command_timeout('git commit'),
+                         cancel_event=cancel_event)
+        committed = commit.returncode == 0
+        if not committed and 'nothing to commit' not in commit.stdout + commit.stderr:
+            result['detail'] = (commit.stderr or commit.stdout).strip()
+            return result
+            
+        push = run_git(['push'], folder, timeout=command_timeout('git push'), cancel_event=cancel_event)
+        if push.returncode != 0 and 'upstream' in push.stderr:
+            branch = run_git(['rev-parse', '--abbrev-ref', 'HEAD'], folder).stdout.strip() or 'main'
+            push = run_git(['push', '--set-upstream', 'origin', branch], folder,
+                           timeout=command_timeout('git push'), cancel_event=cancel_event)
+        if push.returncode != 0:
+            result['detail'] = push.stderr.strip()
+            return result
+            
+        if not committed and 'Everything up-to-date' in push.stderr:
+            result['status'] = 'nada para commitar'
+        else:
+            result['status'] = 'enviado'
+        if snapshot is not None:
+            save_snapshot(folder, snapshot)
+    except subprocess.TimeoutExpired as e:
+        result['detail'] = f"timeout em: {' '.join(e.cmd)}"
+    except CommandCancelled as e:
+        result['status'] = 'cancelado'
+        result['detail'] = f"interrompido em: {e}"
+    except (OSError, RuntimeError) as e:
+        result['detail'] = str(e)
+    finally:
+        result['seconds'] = time.time() - start
+    return result
+
+def update_repositories(folders, msg, max_workers=BATCH_WORKERS, on_result=None, skip_unchanged=True):
+    """Atualiza vários repositórios em paralelo; retorna (resultados, tempo total)"""
+    start = time.time()
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = [pool.submit(update_repository, folder, msg, skip_unchanged) for folder in folders]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results, time.time() - start
+
+# Espelhos: push para vários remotes ao mesmo tempo, com novas tentativas
+MIRROR_RETRIES = 2          # tentativas extras por remote
+MIRROR_BACKOFF = 1.0        # espera (s) antes da 1a nova tentativa; dobra a cada uma
+
+def parse_mirrors(text):
+    """'nome=url, nome2=url2' (vírgulas, espaços ou linhas) -> {nome: url}"""
+    mirrors = {}
+    for item in re.split(r'[,\s]+', text.strip()):
+        name, sep, url = item.partition('=')
+        if sep and name and url:
+            mirrors[name] = url
+    return mirrors
+
+def format_mirrors(mirrors):
+    return ', '.join(f"{name}={url}" for name, url in mirrors.items())
+
+def ensure_remotes(folder, remotes):
+    """Cria (ou corrige a URL de) cada remote; url None = usar o que já existe"""
+    existing = GitRepoReader(folder).status(limit=0)['remotes']
+    for name, url in remotes.items():
+        if url is None or existing.get(name) == url:
+            continue
+        action = 'set-url' if name in existing else 'add'
+        result = run_git(['remote', action, name, url], folder, timeout=command_timeout('git remote add'))
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+
+def push_remote(folder, name, branch, upstream=False, retries=MIRROR_RETRIES, backoff=MIRROR_BACKOFF, force=False,
+                cancel_event=None):
+    """Push de um remote com novas tentativas (espera dobrando); recusas do remote não são repetidas"""
+    start = time.time()
+    result = {'remote': name, 'status': 'falhou', 'attempts': 0, 'detail': ''}
+    args = (['push', '--progress'] + (['--set-upstream'] if upstream else []) + (['--force'] if force else [])
+            + [name, f'HEAD:refs/heads/{branch}'])
+    for attempt in range(retries + 1):
+        if attempt:
+            delay = backoff * 2 ** (attempt - 1)
+            if cancel_event is None:
+                time.sleep(delay)
+            elif cancel_event.wait(delay):
+                result['status'] = 'cancelado'
+                break
+        result['attempts'] = attempt + 1
+        try:
+            push = run_git(args, folder, timeout=command_timeout('git push'), cancel_event=cancel_event)
+        except subprocess.TimeoutExpired:
+            result['detail'] = f"timeout de {command_timeout('git push')}s"
+            continue
+        except CommandCancelled:
+            result['status'] = 'cancelado'
+            result['detail'] = 'interrompido'
+            break
+        if push.returncode == 0:
+            result['status'] = 'enviado'
+            result['detail'] = ''
+            break
+        lines = push.stderr.strip().splitlines() or [f"código {push.returncode}"]
+        result['detail'] = next((line for line in lines if re.match(r'(fatal|error|remote: error):| ! ', line)), lines[-1])
+        if '[rejected]' in push.stderr or 'non-fast-forward' in push.stderr:
+            break  # o remote tem commits que não temos: repetir não resolve
+    result['seconds'] = time.time() - start
+    return result
+
+def push_mirrors(folder, remotes, branch=None, upstream=None, on_result=None, force=False, cancel_event=None):
+    """Push do branch atual para todos os remotes em paralelo; retorna (resultados, tempo total)"""
+    start = time.time()
+    ensure_remotes(folder, remotes)
+    if branch is None:
+        branch = GitRepoReader(folder).status(limit=0)['branch'] or 'main'
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, len(remotes))) as pool:
+        futures = [pool.submit(push_remote, folder, name, branch, name == upstream, force=force,
+                               cancel_event=cancel_event) for name in remotes]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results, time.time() - start
+
+# Clone parcial (sem blobs), raso e esparso, comparado com o clone completo
+CLONE_REFERENCE_FILE = os.path.join(GITPILOT_HOME, "gitpilot_clone.json")
+
+def clone_source(repo):
+    """Pasta local vira file:// (clone local por caminho ignora --filter e --depth)"""
+    if os.path.isdir(repo):
+        return Path(os.path.abspath(repo)).as_uri()
+    return normalize_repo_url(repo)
+
+def build_clone_commands(repo, dest, blobless=True, depth=None, sparse_paths=(), branch=None):
+    """Linhas de comando do clone: o clone em si e, se esparso, o sparse-checkout"""
+    options = ['--progress']
+    if blobless:
+        options.append('--filter=blob:none')
+    if depth:
+        options.append(f'--depth {int(depth)}')
+    if branch:
+        options.append(f'--branch "{branch}"')
+    if sparse_paths:
+        options.append('--sparse')
+    commands = [f'git clone {" ".join(options)} "{clone_source(repo)}" "{dest}"']
+    if sparse_paths:
+        commands.append(f'git -C "{dest}" sparse-checkout set ' + ' '.join(f'"{path}"' for path in sparse_paths))
+    return commands
+
+def dir_size(path):
+    """Espaço ocupado pela pasta (arquivos, sem seguir links)"""
+    size = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                size += os.lstat(os.path.join(dirpath, filename)).st_size
+            except OSError:
+                pass
+    return size
+
+def remove_tree(path):
+    """Apaga a pasta mesmo com arquivos somente leitura (packs do git no Windows)"""
+    def retry(func, target, _):
+        os.chmod(target, stat.S_IWRITE)
+        func(target)
+    shutil.rmtree(path, onerror=retry)
+
+def clone_repository(repo, dest, blobless=True, depth=None, sparse_paths=(), branch=None,
+                     on_progress=None, cancel_event=None):
+    """Clona e mede: retorna {commands, seconds, disk_bytes, transfer, warnings}.
+    Se falhar ou for cancelado, a pasta criada pelo clone é apagada."""
+    dest = os.path.abspath(dest)
+    if os.path.exists(dest) and os.listdir(dest):
+        raise RuntimeError(f"O destino já existe e não está vazio: {dest}")
+    commands = build_clone_commands(repo, dest, blobless, depth, sparse_paths, branch)
+    start = time.time()
+    try:
+        result, metrics = run_transfer(commands[0], os.path.dirname(dest), timeout=command_timeout('git clone'),
+                                       on_progress=on_progress, cancel_event=cancel_event)
+        if result.returncode != 0:
+            lines = result.stderr.splitlines()
+            raise RuntimeError(next((line for line in lines if line.startswith(('fatal', 'error'))),
+                                    lines[-1] if lines else f"código {result.returncode}"))
+        for command in commands[1:]:
+            step = run_shell(command, os.path.dirname(dest), timeout=command_timeout(command),
+                             cancel_event=cancel_event)
+            if step.returncode != 0:
+                raise RuntimeError(step.stderr.strip() or f"{command}: código {step.returncode}")
+    except BaseException:
+        if os.path.isdir(dest):
+            remove_tree(dest)
+        raise
+    return {'commands': commands, 'seconds': round(time.time() - start, 3), 'disk_bytes': dir_size(dest),
+            'transfer': metrics, 'warnings': [line for line in result.stderr.splitlines() if 'warning' in line]}
+
+def load_clone_reference(repo):
+    """Última medição do clone completo deste repositório (None se nunca medido)"""
+    try:
+        with open(CLONE_REFERENCE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get(clone_source(repo))
+    except (OSError, ValueError):
+        return None
+
+def measure_full_clone(repo, cancel_event=None):
+    """Clone completo em pasta temporária só para medir tempo e disco; guarda como referência"""
+    base = tempfile.mkdtemp(prefix='gitpilot_full_')
+    try:
+        full = clone_repository(repo, os.path.join(base, 'full'), blobless=False, cancel_event=cancel_event)
+    finally:
+        remove_tree(base)
+    reference = {'seconds': full['seconds'], 'disk_bytes': full['disk_bytes'],
+                 'time': time.strftime('%Y-%m-%dT%H:%M:%S')}
+    try:
+        with open(CLONE_REFERENCE_FILE, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+    saved[clone_source(repo)] = reference
+    ensure_gitpilot_home()
+    try:
+        with open(CLONE_REFERENCE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(saved, f, indent=2)
+    except OSError:
+        pass
+    return reference
+
+def format_clone_savings(result, reference):
+    """Tempo e disco do clone comparados com o clone completo"""
+    text = f"{result['seconds']:.1f}s, {format_size(result['disk_bytes'])} em disco"
+    if not reference:
+        return text + " (sem medição do clone completo para comparar)"
+    saved_time = reference['seconds'] - result['seconds']
+    saved_disk = reference['disk_bytes'] - result['disk_bytes']
+    percent = 100 * saved_disk / reference['disk_bytes'] if reference['disk_bytes'] else 0
+    return (text + f" | completo: {reference['seconds']:.1f}s, {format_size(reference['disk_bytes'])}"
+            f" | economia: {saved_time:.1f}s, {format_size(max(saved_disk, 0))} ({percent:.0f}% do disco)")
+
+# Fila de jobs: prioridade; repositorios diferentes em paralelo, o mesmo repositorio em serie
+JOB_PRIORITIES = {'Alta': 0, 'Normal': 1, 'Baixa': 2}
+JOB_PRIORITY_NAMES = {value: name for name, value in JOB_PRIORITIES.items()}
+JOB_WORKERS = 4
+JOB_HISTORY = 20
+
+class Job:
+    """Pedido na fila: o que executar, em qual repositório, e o estado da execução"""
+    
+    def __init__(self, job_id, key, title, run, priority, log=None, group=None):
+        self.id = job_id
+        self.key = key
+        self.title = title
+        self.run = run
+        self.priority = priority
+        self.group = group  # lote com limite de paralelismo próprio (None = limite geral da fila)
+        # Linhas do job saem com o número dele (jobs em paralelo intercalam no log)
+        self.log = (lambda msg: log(f"J{job_id} {msg}")) if log else (lambda msg: None)
+        self.state = 'na fila'
+        self.detail = ''
+        self.cancel_event = threading.Event()
+        self.submitted = time.time()
+        self.started = None
+        self.ended = None
+        self.work_dir = None
+        self.parallel_stage = False
+        
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+class JobQueue:
+    """Agendador: tira da fila por prioridade (e ordem de chegada), um job por repositório por vez"""
+    
+    def __init__(self, max_workers=JOB_WORKERS, on_change=None):
+        self.max_workers = max_workers
+        self.group_limits = {}  # grupo -> jobs do grupo ao mesmo tempo (fora do limite geral)
+        self.on_change = on_change
+        self.lock = threading.Lock()
+        self.pending = []
+        self.running = {}  # chave do repositório -> job
+        self.finished = deque(maxlen=JOB_HISTORY)
+        self.next_id = 1
+        
+    def submit(self, key, title, run, priority=JOB_PRIORITIES['Normal'], log=None, group=None, group_limit=None):
+        """Enfileira run(job); retorna o Job. Jobs de um grupo contam só no group_limit dele"""
+        with self.lock:
+            if group is not None and group_limit is not None:
+                self.group_limits[group] = max(1, group_limit)
+            job = Job(self.next_id, key, title, run, priority, log, group)
+            self.next_id += 1
+            self.pending.append(job)
+        self.dispatch()
+        return job
+        
+    def dispatch(self):
+        """Inicia os jobs que podem rodar agora"""
+        with self.lock:
+            self.pending.sort(key=lambda job: (job.priority, job.id))
+            counts = {}
+            for job in self.running.values():
+                counts[job.group] = counts.get(job.group, 0) + 1
+            for job in list(self.pending):
+                limit = self.group_limits.get(job.group, self.max_workers) if job.group else self.max_workers
+                if counts.get(job.group, 0) >= limit:
+                    continue
+                if job.key in self.running:
+                    continue  # mesmo repositório: espera o anterior
+                counts[job.group] = counts.get(job.group, 0) + 1
+                self.pending.remove(job)
+                self.running[job.key] = job
+                job.state = 'executando'
+                job.started = time.time()
+                threading.Thread(target=self.work, args=(job,), daemon=True).start()
+        self.notify()
+        
+    def work(self, job):
+        try:
+            ok = job.run(job)
+            # PARAR depois que o trabalho já terminou não muda o resultado
+            job.state = 'cancelado' if job.cancelled and not ok else ('concluído' if ok else 'com erro')
+        except CommandCancelled:
+            job.state = 'cancelado'
+        except Exception as e:
+            job.state = 'falhou'
+            job.detail = str(e)
+            job.log(f"❌ ERRO: {e}")
+        finally:
+            job.ended = time.time()
+            with self.lock:
+                self.running.pop(job.key, None)
+                self.finished.appendleft(job)
+            self.dispatch()
+            
+    def cancel(self, job_id):
+        """Tira da fila ou pede para parar; retorna True se achou o job"""
+        with self.lock:
+            for job in self.pending:
+                if job.id == job_id:
+                    self.pending.remove(job)
+                    job.state = 'cancelado'
+                    job.cancel_event.set()
+                    self.finished.appendleft(job)
+                    break
+            else:
+                job = next((j for j in self.running.values() if j.id == job_id), None)
+                if job is None:
+                    return False
+                job.cancel_event.set()
+        self.notify()
+        return True
+        
+    def cancel_all(self):
+        """Cancela tudo (fila e em andamento); retorna quantos jobs foram afetados"""
+        with self.lock:
+            ids = [job.id for job in self.pending] + [job.id for job in self.running.values()]
+        return sum(self.cancel(job_id) for job_id in ids)
+        
+    def busy(self, key=None):
+        """Há jobs na fila ou executando (de um repositório, se key for dado)?"""
+        with self.lock:
+            if key is None:
+                return bool(self.pending or self.running)
+            return key in self.running or any(job.key == key for job in self.pending)
+            
+    def snapshot(self):
+        """Executando, depois na fila (na ordem em que vão rodar), depois os últimos concluídos"""
+        with self.lock:
+            return (sorted(self.running.values(), key=lambda job: job.started)
+                    + sorted(self.pending, key=lambda job: (job.priority, job.id)) + list(self.finished))
+                    
+    def notify(self):
+        if self.on_change:
+            self.on_change()
+
+class AsyncJobEngine:
+    """Executa jobs (listas de comandos) com subprocessos asyncio em um loop próprio"""
+    
+    def __init__(self):
+        global asyncio
+        import asyncio  # sob demanda: a linha de comando e o modo Git Bash não pagam a importação
+        self.loop = asyncio.new_event_loop()
+        self.jobs = {}
+        self.next_id = 1
+        self.lock = threading.Lock()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        
+    def submit(self, commands, cwd, on_line, on_done, on_command=None, on_progress=None, on_transfer=None):
+        """Agenda um job; on_line(job_id, texto) a cada linha, on_done(job_id, resultado),
+        on_command(comando, pasta, código, segundos) ao fim de cada comando; nos push/fetch com --progress,
+        on_progress(fase, percentual) e on_transfer(comando, pasta, código, métricas)"""
+        with self.lock:
+            job_id = self.next_id
+            self.next_id += 1
+        start = time.time()
+        future = asyncio.run_coroutine_threadsafe(self.run_job(job_id, commands, cwd, on_line, on_command,
+                                                               on_progress, on_transfer),
+                                                  self.loop)
+        self.jobs[job_id] = future
+        
+        def finished(f):
+            self.jobs.pop(job_id, None)
+            if f.cancelled():
+                result = None
+            else:
+                try:
+                    result = f.result()
+                except Exception as e:
+                    # Ex.: pasta de trabalho inexistente; o job termina com erro em vez de ficar pendurado
+                    on_line(job_id, f"❌ ERRO: {e}")
+                    result = {'failures': 1, 'elapsed': time.time() - start, 'error': str(e)}
+            on_done(job_id, result)
+            
+        future.add_done_callback(finished)
+        return job_id
+        
+    def cancel(self, job_id):
+        """Cancela um job em andamento (mata os processos)"""
+        future = self.jobs.get(job_id)
+        if future:
+            future.cancel()
+            
+    def cancel_all(self):
+        """Cancela todos os jobs em andamento (mata os processos)"""
+        for future in list(self.jobs.values()):
+            future.cancel()
+            
+    def active_jobs(self):
+        return len(self.jobs)
+        
+    async def run_job(self, job_id, commands, cwd, on_line, on_command=None, on_progress=None, on_transfer=None):
+        """Executa os comandos em sequência, acompanhando a saída em tempo real"""
+        failures = 0
+        start = time.time()
+        total = len(commands)
+        for i, cmd in enumerate(commands, 1):
+            on_line(job_id, f"[{i}/{total}] {cmd}")
+            try:
+                target = resolve_cd(cmd, cwd)
+            except RuntimeError as e:
+                # Sem a pasta certa os próximos comandos rodariam no lugar errado
+                on_line(job_id, f"❌ ERRO: {e}")
+                failures += 1
+                break
+            if target:
+                cwd = target
+                continue
+            cmd_start = time.time()
+            code = await self.run_command(job_id, cmd, cwd, on_line, command_timeout(cmd), on_progress, on_transfer)
+            if on_command:
+                on_command(cmd, cwd, code, time.time() - cmd_start)
+            if code:
+                failures += 1
+        return {'failures': failures, 'elapsed': time.time() - start}
+        
+    async def run_command(self, job_id, command, cwd, on_line, timeout, on_progress=None, on_transfer=None):
+        """Executa um comando, repassando stdout/stderr linha a linha"""
+        bash = find_bash()
+        options = dict(cwd=cwd or None, env=git_env(),
+                       stdin=asyncio.subprocess.DEVNULL, stdout=asyncio.subprocess.PIPE,
+                       stderr=asyncio.subprocess.PIPE)
+        if sys.platform.startswith('win'):
+            options['creationflags'] = subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            options['start_new_session'] = True  # grupo próprio: o cancelamento mata a árvore toda
+        locks = git_lock_files(cwd)
+        if bash:
+            proc = await asyncio.create_subprocess_exec(bash, '-c', command, **options)
+        else:
+            proc = await asyncio.create_subprocess_shell(command, **options)
+            
+        start = time.time()
+        progress = TransferProgress(on_progress) if is_transfer_command(command) else None
+        
+        def emit_stderr(text):
+            if progress:
+                seen = len(progress.lines)
+                progress.parse_line(text.strip())
+                if len(progress.lines) == seen:
+                    return  # progresso intermediário: vai para a barra, não para o log
+            on_line(job_id, f"   ! {text}")
+            
+        gathered = asyncio.gather(
+            self.pump(proc.stdout, lambda text: on_line(job_id, f"   {text}")),
+            self.pump(proc.stderr, emit_stderr),
+            proc.wait())
+        # Cancelado junto com o job: consumir o resultado para o asyncio não reclamar
+        gathered.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            await asyncio.wait_for(gathered, timeout)
+        except asyncio.TimeoutError:
+            signal_process_group(proc.pid, force=True)
+            await proc.wait()
+            on_line(job_id, f"❌ Timeout de {timeout}s - processo encerrado")
+            return -1
+        except asyncio.CancelledError:
+            signal_process_group(proc.pid)
+            try:
+                await asyncio.wait_for(asyncio.shield(proc.wait()), 0.3)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                signal_process_group(proc.pid, force=True)
+            removed = remove_stale_locks(cwd, start, locks)
+            on_line(job_id, f"⏹️ Cancelado em: {command}" + (f" (travas removidas: {', '.join(removed)})"
+                                                             if removed else ""))
+            raise
+            
+        elapsed = time.time() - start
+        if proc.returncode == 0:
+            on_line(job_id, f"✓ Código 0 ({elapsed:.2f}s)")
+        else:
+            on_line(job_id, f"❌ Código {proc.returncode} ({elapsed:.2f}s)")
+        if progress and on_transfer:
+            on_transfer(command, cwd, proc.returncode, progress.metrics())
+        return proc.returncode
+        
+    async def pump(self, stream, emit):
+        """Lê o stream em blocos e emite cada linha ('\r' do progresso do git também separa)"""
+        buffer = b''
+        while True:
+            chunk = await stream.read(4096)
+            if not chunk:
+                break
+            buffer += chunk
+            parts = re.split(rb'[\r\n]', buffer)
+            buffer = parts.pop()
+            for part in parts:
+                if part.strip():
+                    emit(part.decode('utf-8', errors='replace'))
+        if buffer.strip():
+            emit(buffer.decode('utf-8', errors='replace'))
+
+def parse_git_config(path):
+    """Lê um arquivo de config do git: {(secao, subsecao): {chave: [valores]}}"""
+    config = {}
+    section = None
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            lines = f.readlines()
+    except OSError:
+        return config
+    for raw in lines:
+        line = raw.strip()
+        if not line or line[0] in '#;':
+            continue
+        header = re.match(r'^\[\s*([^\s\]"]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]', line)
+        if header:
+            name, sub = header.group(1).lower(), header.group(2)
+            if sub is None and '.' in name:
+                name, sub = name.split('.', 1)
+            section = (name, sub)
+            config.setdefault(section, {})
+            continue
+        if section is None:
+            continue
+        key, sep, value = line.partition('=')
+        value = value.strip().strip('"') if sep else 'true'
+        config[section].setdefault(key.strip().lower(), []).append(value)
+    return config
+
+def parse_commit(sha, data):
+    """Extrai autor, data, pais e assunto de um objeto commit"""
+    header, _, message = data.partition(b'\n\n')
+    commit = {'sha': sha, 'parents': [], 'author': '', 'timestamp': 0,
+              'subject': message.split(b'\n', 1)[0].decode('utf-8', errors='replace')}
+    for line in header.split(b'\n'):
+        if line.startswith(b'parent '):
+            commit['parents'].append(line[7:].decode('ascii'))
+        elif line.startswith(b'author '):
+            author = re.match(rb'author (.*?) <[^>]*> (\d+)', line)
+            if author:
+                commit['author'] = author.group(1).decode('utf-8', errors='replace')
+                commit['timestamp'] = int(author.group(2))
+    return commit
+
+class CatFileBatch:
+    """Processo 'git cat-file --batch' mantido aberto para ler objetos sem novo processo"""
+    
+    def __init__(self, folder):
+        self.folder = folder
+        self.proc = None
+        self.lock = threading.Lock()
+        
+    def start(self):
+        self.proc = subprocess.Popen(
+            ['git', 'cat-file', '--batch'], cwd=self.folder,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0))
+        
+    def read(self, sha):
+        """Retorna (tipo, conteúdo) do objeto ou (None, None) se não existir"""
+        with self.lock:
+            if self.proc is None or self.proc.poll() is not None:
+                self.start()
+            self.proc.stdin.write(sha.encode('ascii') + b'\n')
+            self.proc.stdin.flush()
+            header = self.proc.stdout.readline().split()
+            if len(header) < 3:
+                return None, None
+            data = self.proc.stdout.read(int(header[2]))
+            self.proc.stdout.read(1)  # '\n' depois do conteúdo
+            return header[1].decode('ascii'), data
+            
+    def close(self):
+        with self.lock:
+            if self.proc and self.proc.poll() is None:
+                self.proc.stdin.close()
+                self.proc.wait()
+            self.proc = None
+
+class GitRepoReader:
+    """Lê branches, HEAD, remotes, upstream e commits direto do .git, com cache por mtime"""
+    
+    def __init__(self, folder):
+        self.folder = os.path.abspath(folder)
+        self.git_dir = self.find_git_dir()
+        # Worktrees guardam refs/config no diretório comum
+        self.common_dir = self.git_dir
+        commondir_file = os.path.join(self.git_dir, 'commondir')
+        if os.path.exists(commondir_file):
+            with open(commondir_file, 'r', encoding='utf-8') as f:
+                self.common_dir = os.path.normpath(os.path.join(self.git_dir, f.read().strip()))
+        self.objects = CatFileBatch(self.folder)
+        self.cache_key = None
+        self.cache = None
+        
+    def find_git_dir(self):
+        dot_git = os.path.join(self.folder, '.git')
+        if os.path.isfile(dot_git):
+            with open(dot_git, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+            if content.startswith('gitdir:'):
+                return os.path.normpath(os.path.join(self.folder, content[7:].strip()))
+        if os.path.isdir(dot_git):
+            return dot_git
+        raise RuntimeError(f"Não é um repositório git: {self.folder}")
+        
+    def signature(self):
+        """mtimes de HEAD, config, packed-refs e de tudo em refs/ (muda a cada commit/fetch/push)"""
+        stamps = []
+        for path in (os.path.join(self.git_dir, 'HEAD'), os.path.join(self.common_dir, 'config'),
+                     os.path.join(self.common_dir, 'packed-refs')):
+            try:
+                stamps.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                stamps.append(0)
+        pending = [os.path.join(self.common_dir, 'refs')]
+        while pending:
+            folder = pending.pop()
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        stamps.append((entry.name, entry.stat(follow_symlinks=False).st_mtime_ns))
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+            except OSError:
+                pass
+        return tuple(stamps)
+        
+    def read_refs(self):
+        """Junta packed-refs e refs soltas (as soltas têm prioridade)"""
+        refs = {}
+        try:
+            with open(os.path.join(self.common_dir, 'packed-refs'), 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line[0] in '#^':
+                        continue
+                    sha, _, name = line.strip().partition(' ')
+                    refs[name] = sha
+        except OSError:
+            pass
+        refs_root = os.path.join(self.common_dir, 'refs')
+        for dirpath, _, filenames in os.walk(refs_root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = 'refs/' + os.path.relpath(path, refs_root).replace(os.sep, '/')
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        value = f.read().strip()
+                except OSError:
+                    continue
+                if re.fullmatch(r'[0-9a-f]{40,64}', value):
+                    refs[name] = value
+        return refs
+        
+    def read_head(self):
+        """Retorna (branch ou None se destacado, sha ou ref simbólica)"""
+        with open(os.path.join(self.git_dir, 'HEAD'), 'r', encoding='utf-8') as f:
+            head = f.read().strip()
+        if head.startswith('ref: '):
+            ref = head[5:]
+            return ref[len('refs/heads/'):] if ref.startswith('refs/heads/') else ref, ref
+        return None, head
+        
+    def read_log(self, sha, limit):
+        """Últimos commits seguindo o primeiro pai"""
+        commits = []
+        while sha and len(commits) < limit:
+            kind, data = self.objects.read(sha)
+            if kind != 'commit':
+                break
+            commit = parse_commit(sha, data)
+            commits.append(commit)
+            sha = commit['parents'][0] if commit['parents'] else None
+        return commits
+        
+    def status(self, limit=5):
+        """Status do repositório; lê o disco só quando algo em .git mudou"""
+        key = (self.signature(), limit)
+        if key == self.cache_key:
+            return self.cache
+            
+        refs = self.read_refs()
+        config = parse_git_config(os.path.join(self.common_dir, 'config'))
+        branch, head_ref = self.read_head()
+        head_sha = refs.get(head_ref) if head_ref.startswith('refs/') else head_ref
+        
+        remotes = {sub: values.get('url', [''])[-1]
+                   for (name, sub), values in config.items() if name == 'remote' and sub}
+        upstream = None
+        branch_config = config.get(('branch', branch), {}) if branch else {}
+        if 'remote' in branch_config and 'merge' in branch_config:
+            merge = branch_config['merge'][-1]
+            upstream = f"{branch_config['remote'][-1]}/{merge[len('refs/heads/'):] if merge.startswith('refs/heads/') else merge}"
+            
+        self.cache = {
+            'folder': self.folder,
+            'branch': branch,
+            'detached': branch is None,
+            'head': head_sha,
+            'branches': sorted(name[len('refs/heads/'):] for name in refs if name.startswith('refs/heads/')),
+            'remote_branches': sorted(name[len('refs/remotes/'):] for name in refs
+                                      if name.startswith('refs/remotes/') and not name.endswith('/HEAD')),
+            'remotes': remotes,
+            'upstream': upstream,
+            'upstream_head': refs.get(f'refs/remotes/{upstream}') if upstream else None,
+            'commits': self.read_log(head_sha, limit),
+        }
+        self.cache_key = key
+        return self.cache
+        
+    def close(self):
+        self.objects.close()
+
+def format_repo_status(status):
+    """Texto do painel de status"""
+    lines = [f"📁 {status['folder']}"]
+    if status['detached']:
+        lines.append(f"🔀 HEAD destacado em {(status['head'] or '')[:7]}")
+    else:
+        lines.append(f"🔀 Branch: {status['branch']}" + ("" if status['head'] else " (sem commits)"))
+    if status['upstream']:
+        same = status['upstream_head'] == status['head']
+        lines.append(f"⬆️ Upstream: {status['upstream']}" + (" (sincronizado)" if same else " (diferente do local)"))
+    else:
+        lines.append("⬆️ Upstream: nenhum")
+    lines.append("")
+    lines.append("🌐 Remotes:")
+    for name, url in sorted(status['remotes'].items()):
+        lines.append(f"   {name}\t{url}")
+    if not status['remotes']:
+        lines.append("   (nenhum)")
+    lines.append("")
+    lines.append("🌿 Branches:")
+    for name in status['branches']:
+        lines.append(f"   {'*' if name == status['branch'] else ' '} {name}")
+    for name in status['remote_branches']:
+        lines.append(f"     remotes/{name}")
+    lines.append("")
+    lines.append(f"📜 Últimos {len(status['commits'])} commits:")
+    for commit in status['commits']:
+        date = time.strftime('%d/%m %H:%M', time.localtime(commit['timestamp']))
+        lines.append(f"   {commit['sha'][:7]} {date} {commit['author']}: {commit['subject']}")
+    return '\n'.join(lines)
+
+# Leitores abertos (um processo cat-file por repositório)
+repo_readers = {}
+
+def get_repo_reader(folder):
+    """Reaproveita o leitor (e seu cache) de cada pasta"""
+    folder = os.path.abspath(folder)
+    if folder not in repo_readers:
+        repo_readers[folder] = GitRepoReader(folder)
+    return repo_readers[folder]
+
+# Configuracao: gravacao atomica e agrupada (debounce) fora da thread da interface
+CONFIG_FILE = "git_automator_config.json"
+CONFIG_SAVE_DELAY = 0.5
+CONFIG_MRU_SIZE = 15
+CONFIG_OBSOLETE_KEYS = ('char_delay', 'command_delay', 'last_commit')  # de versões antigas, nunca lidas
+
+class ConfigStore:
+    """Config em JSON (acesso como dict) com perfis por repositório e lista de recentes (MRU)"""
+    
+    def __init__(self, path=CONFIG_FILE, delay=CONFIG_SAVE_DELAY, on_error=None):
+        self.path = path
+        self.delay = delay
+        self.on_error = on_error
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.timer = None
+        self.data = self.load()
+        
+    def load(self):
+        data = {'git_name': '', 'git_email': '', 'use_clipboard': True}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            # Arquivo ilegível: guardar uma cópia para análise e começar do padrão
+            print(f"⚠️ Config inválida ({e}), salva em {self.path}.bad")
+            try:
+                os.replace(self.path, self.path + '.bad')
+            except OSError:
+                pass
+        for key in CONFIG_OBSOLETE_KEYS:
+            data.pop(key, None)
+        data.setdefault('profiles', {})
+        data.setdefault('recent', [])
+        # Versões anteriores guardavam só a última pasta/URL
+        folder = data.pop('last_folder', '')
+        repo = data.pop('last_repo', '')
+        if folder and self.key(folder) not in data['profiles']:
+            data['profiles'][self.key(folder)] = {'folder': folder, 'repo': repo}
+            data['recent'].insert(0, self.key(folder))
+        return data
+        
+    @staticmethod
+    def key(folder):
+        return os.path.normcase(os.path.abspath(folder))
+        
+    def get(self, key, default=None):
+        with self.lock:
+            return self.data.get(key, default)
+            
+    def __getitem__(self, key):
+        with self.lock:
+            return self.data[key]
+            
+    def __setitem__(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            
+    def profile(self, folder):
+        """Perfil da pasta (URL, branch, ajustes de tempo, último resultado); {} se não houver"""
+        with self.lock:
+            return dict(self.data['profiles'].get(self.key(folder), {}))
+            
+    def update_profile(self, folder, **values):
+        """Atualiza o perfil da pasta e a coloca no topo dos recentes"""
+        key = self.key(folder)
+        with self.lock:
+            profile = self.data['profiles'].setdefault(key, {'folder': folder})
+            profile.update(values)
+            recent = [k for k in self.data['recent'] if k != key]
+            self.data['recent'] = [key] + recent[:CONFIG_MRU_SIZE - 1]
+        self.save()
+        
+    def recent_folders(self):
+        with self.lock:
+            profiles = self.data['profiles']
+            return [profiles[key].get('folder', key) for key in self.data['recent'] if key in profiles]
+            
+    def save(self):
+        """Agenda a gravação; várias chamadas seguidas viram uma só"""
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.delay, self.write)
+            self.timer.daemon = True
+            self.timer.start()
+            
+    def flush(self):
+        """Grava agora o que estiver pendente (ao fechar o programa)"""
+        with self.lock:
+            pending = self.timer is not None
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+        if pending:
+            self.write()
+            
+    def write(self):
+        """Grava em arquivo temporário e troca pelo original (uma queda no meio não corrompe a config)"""
+        with self.lock:
+            self.timer = None
+            text = json.dumps(self.data, indent=2, ensure_ascii=False)
+        folder = os.path.dirname(os.path.abspath(self.path))
+        tmp_path = None
+        with self.write_lock:
+            try:
+                fd, tmp_path = tempfile.mkstemp(prefix='.gitpilot_config_', suffix='.tmp', dir=folder)
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                if self.on_error:
+                    self.on_error(e)
+
+# Montagem dos comandos (compartilhada pela janela e pela linha de comando)
+def normalize_repo_url(repo):
+    """Formata a URL para HTTPS (pastas locais e file:// ficam como estão)"""
+    if repo.startswith('file://') or os.path.isdir(repo):
+        return repo
+    if repo.startswith('git@github.com:'):
+        repo = repo.replace('git@github.com:', 'https://github.com/')
+    if not repo.endswith('.git'):
+        repo = repo + '.git'
+    if not repo.startswith('http'):
+        repo = 'https://' + repo
+    return repo
+
+class PlanStep:
+    """Passo de um plano: comando + condição que, já satisfeita no repositório, dispensa o passo"""
+    
+    def __init__(self, command, satisfied=None):
+        self.command = command
+        # satisfied(estado) -> motivo (texto) quando o passo é desnecessário, senão None
+        self.satisfied = satisfied
+        
+    def skip_reason(self, state):
+        return self.satisfied(state) if self.satisfied and state else None
+
+def probe_repo_state(folder):
+    """Lê de uma vez o estado que os planos consultam (init, config, remotes, branch) direto do .git"""
+    if not folder or not os.path.isdir(folder):
+        return None
+    state = {'is_repo': False, 'config': {}, 'remotes': {}, 'branch': None, 'head': None, 'upstream': None}
+    try:
+        reader = get_repo_reader(folder)
+        status = reader.status(limit=0)
+    except (OSError, RuntimeError):
+        return state
+    state.update(is_repo=True, config=parse_git_config(os.path.join(reader.common_dir, 'config')),
+                 remotes=status['remotes'], branch=status['branch'], head=status['head'],
+                 upstream=status['upstream'])
+    return state
+
+def resolve_plan(plan, state):
+    """Separa os comandos a executar dos passos já satisfeitos: (comandos, [(comando, motivo)]).
+    Itens que são texto (comandos avulsos no meio do plano) sempre rodam"""
+    commands, skipped = [], []
+    for step in plan:
+        if not isinstance(step, PlanStep):
+            commands.append(step)
+            continue
+        reason = step.skip_reason(state)
+        if reason:
+            skipped.append((step.command, reason))
+        else:
+            commands.append(step.command)
+    return commands, skipped
+
+def format_plan(plan, state):
+    """Prévia (dry-run) do plano: o que roda e o que seria pulado"""
+    lines = []
+    for step in plan:
+        reason = step.skip_reason(state)
+        lines.append(f"⏭️ {step.command}   ({reason})" if reason else f"▶️ {step.command}")
+    if state is None:
+        lines.append("(pasta inacessível daqui: nenhum passo pode ser conferido, todos serão executados)")
+    return '\n'.join(lines)
+
+# Pre-voo do Novo Projeto: todas as verificacoes ao mesmo tempo, um relatorio so
+PREFLIGHT_REMOTE_TIMEOUT = 20  # s para o ls-remote responder
+PREFLIGHT_ICONS = {'ok': '✅', 'aviso': '⚠️', 'erro': '❌'}
+
+def preflight_git(folder, repo, state, limit):
+    result = run_git(['--version'], folder, timeout=DEFAULT_COMMAND_TIMEOUT)
+    if result.returncode != 0:
+        return 'erro', result.stderr.strip() or "git não respondeu"
+    return 'ok', result.stdout.strip()
+
+def preflight_identity(folder, repo, state, limit):
+    values = {key: run_git(['config', key], folder, timeout=DEFAULT_COMMAND_TIMEOUT).stdout.strip()
+              for key in ('user.name', 'user.email')}
+    missing = [key for key, value in values.items() if not value]
+    if missing:
+        return 'erro', f"faltando {', '.join(missing)} (aba Config): o commit vai falhar"
+    return 'ok', f"{values['user.name']} <{values['user.email']}>"
+
+def preflight_repo(folder, repo, state, limit):
+    if not state['is_repo']:
+        return 'ok', "ainda sem repositório (o plano faz o git init)"
+    return 'ok', "repositório já inicializado" + ("" if state['head'] else " (sem commits)")
+
+def preflight_remotes(folder, repo, state, limit):
+    remotes = state['remotes']
+    origin = remotes.get('origin')
+    others = ', '.join(f"{name}={url}" for name, url in sorted(remotes.items()) if name != 'origin')
+    suffix = f"; outros: {others}" if others else ""
+    if origin is None:
+        return 'ok', "sem origin (será adicionado)" + suffix
+    if normalize_repo_url(origin) == repo:
+        return 'ok', f"origin já aponta para {repo}" + suffix
+    return 'aviso', f"origin aponta para {origin} (será trocado)" + suffix
+
+def preflight_branch(folder, repo, state, limit):
+    if not state['is_repo']:
+        return 'ok', "main (após o git init)"
+    if state['branch'] is None:
+        return 'aviso', f"HEAD destacado em {state['head'][:8]}"
+    if state['branch'] != 'main':
+        return 'aviso', f"{state['branch']} (será renomeado para main)"
+    return 'ok', 'main'
+
+def preflight_upstream(folder, repo, state, limit):
+    if state['upstream']:
+        return 'ok', state['upstream']
+    return 'ok', "sem upstream (o push cria com --set-upstream)"
+
+def preflight_changes(folder, repo, state, limit):
+    if not state['is_repo']:
+        return 'ok', f"{len(scan_tree(folder))} arquivo(s) no primeiro commit"
+    result = run_git(['status', '--porcelain', '-z', '--untracked-files=all'], folder, timeout=command_timeout('git add'))
+    if result.returncode != 0:
+        return 'erro', result.stderr.strip()
+    changes = [entry for entry in result.stdout.split('\0') if entry[:2].strip()]
+    if not changes:
+        return ('aviso' if state['head'] else 'erro'), "nada para commitar"
+    return 'ok', f"{len(changes)} mudança(s) para commitar"
+
+def preflight_large_files(folder, repo, state, limit):
+    large = find_large_files(folder, limit)
+    if not large:
+        return 'ok', f"nenhum arquivo acima de {format_size(limit)}"
+    listed = ', '.join(f"{rel} ({format_size(size)})" for rel, size in large[:3])
+    return 'aviso', f"{len(large)} acima de {format_size(limit)}: {listed}" + (" ..." if len(large) > 3 else "")
+
+def preflight_remote(folder, repo, state, limit):
+    result = run_git(['ls-remote', '--heads', repo], folder, timeout=PREFLIGHT_REMOTE_TIMEOUT)
+    if result.returncode != 0:
+        lines = result.stderr.strip().splitlines()
+        return 'erro', next((line for line in lines if 'fatal' in line or 'error' in line),
+                            lines[-1] if lines else f"código {result.returncode}")
+    heads = [line.split('\t')[-1][len('refs/heads/'):] for line in result.stdout.splitlines()]
+    if 'main' in heads:
+        return 'aviso', "acessível; já tem um branch main (o push pode ser recusado sem --force)"
+    return 'ok', "acessível" + (f" (branches: {', '.join(heads)})" if heads else " (vazio)")
+
+PREFLIGHT_CHECKS = [
+    ('Git instalado', preflight_git),
+    ('Identidade (user.name/email)', preflight_identity),
+    ('Repositório', preflight_repo),
+    ('Remotes', preflight_remotes),
+    ('Branch atual', preflight_branch),
+    ('Upstream', preflight_upstream),
+    ('Mudanças pendentes', preflight_changes),
+    ('Arquivos grandes', preflight_large_files),
+    ('Remoto acessível', preflight_remote),
+]
+
+def run_preflight(folder, repo, limit=LARGE_FILE_LIMIT_MB * 1024 * 1024):
+    """Roda todas as verificações do Novo Projeto em paralelo; retorna [{check, status, detail, seconds}]"""
+    state = probe_repo_state(folder) or {'is_repo': False, 'remotes': {}, 'branch': None,
+                                         'head': None, 'upstream': None}
+    
+    def check(name, func):
+        start = time.time()
+        try:
+            status, detail = func(folder, repo, state, limit)
+        except subprocess.TimeoutExpired as e:
+            status, detail = 'erro', f"timeout de {e.timeout}s"
+        except (OSError, RuntimeError) as e:
+            status, detail = 'erro', str(e)
+        return {'check': name, 'status': status, 'detail': detail, 'seconds': round(time.time() - start, 3)}
+        
+    with ThreadPoolExecutor(max_workers=len(PREFLIGHT_CHECKS)) as pool:
+        futures = [pool.submit(check, name, func) for name, func in PREFLIGHT_CHECKS]
+        return [future.result() for future in futures]
+
+def format_preflight(report):
+    """Relatório do pré-voo, uma linha por verificação"""
+    return '\n'.join(f"{PREFLIGHT_ICONS[item['status']]} {item['check']}: {item['detail']}" for item in report)
+
+def build_publish_plan(repo, msg, folder='', clean_remote=True, force=False,
+                       basic_gitignore=False, before_add=()):
+    """Plano do Novo Projeto: init, .gitignore, commit, remote e push"""
+    plan = []
+    
+    # Navegar para pasta se especificada
+    if folder:
+        folder_path = folder.replace('\\', '/')
+        plan.append(PlanStep(f'cd "{folder_path}"'))
+        
+    # Inicializar se necessário (antes do config --local, que exige um repositório)
+    plan.append(PlanStep('git init', lambda s: s['is_repo'] and "já é um repositório"))
+    
+    # Configurar para usar HTTPS em vez de SSH
+    plan.append(PlanStep(
+        'git config --local url."https://github.com/".insteadOf git@github.com:',
+        lambda s: 'git@github.com:' in s['config'].get(('url', 'https://github.com/'), {}).get('insteadof', [])
+        and "HTTPS já configurado"))
+    
+    # Origin já aponta para o repositório certo: nada a remover nem adicionar
+    origin_ok = lambda s: s['remotes'].get('origin') == repo and "origin já aponta para o repositório"
+    
+    # Limpeza automática se marcada
+    if clean_remote:
+        plan.append(PlanStep('git remote remove origin 2>/dev/null || true',
+                             lambda s: origin_ok(s) or ('origin' not in s['remotes'] and "sem origin")))
+        
+    # .gitignore fixo (quando a pasta não pode ser analisada daqui)
+    if basic_gitignore:
+        plan.extend(PlanStep(cmd) for cmd in [
+            'echo "node_modules/" > .gitignore',
+            'echo "*.log" >> .gitignore',
+            'echo ".env" >> .gitignore',
+            'echo "__pycache__/" >> .gitignore',
+            'echo "venv/" >> .gitignore'
+        ])
+    plan.extend(PlanStep(cmd) for cmd in before_add)
+    
+    # Verificar se há mudanças e adicionar
+    plan.extend([
+        PlanStep('git add .'),
+        PlanStep(f'git commit -m "{msg}" || echo "Nada para commitar"')
+    ])
+    
+    # Configurar remote e fazer push
+    plan.extend([
+        PlanStep(f'git remote add origin {repo}', origin_ok),
+        PlanStep('git branch -M main', lambda s: s['branch'] == 'main' and "já está na main"),
+        PlanStep(f'git push --progress --set-upstream origin main{" --force" if force else ""}')
+    ])
+    return plan
+
+def build_update_commands(msg):
+    """Comandos da aba Atualizar"""
+    return [
+        'git add .',
+        f'git commit -m "{msg}" || echo "Nada para commitar"',
+        'git push --progress || git push --progress --set-upstream origin main'
+    ]
+
+def build_git_config_commands(name, email):
+    """Comandos da aba Config (identidade global + HTTPS)"""
+    return [
+        f'git config --global user.name "{name}"',
+        f'git config --global user.email "{email}"',
+        'git config --global url."https://github.com/".insteadOf git@github.com:',
+        'git config --list | grep user'
+    ]
+
+TEST_COMMANDS = [
+    "echo '=== TESTE DO SISTEMA v3.2 ==='",
+    "pwd",
+    "git --version",
+    "git config --list | grep user",
+    "git status",
+    "echo 'Sistema funcionando perfeitamente!'"
+]
+
+# Correções rápidas: nome -> (comandos, mensagem de sucesso, destrutiva?)
+FIX_COMMANDS = {
+    'https': ([
+        'git config --global url."https://github.com/".insteadOf git@github.com:',
+        'git config --global --list | grep url',
+        'echo "Git configurado para usar HTTPS!"'
+    ], "🔒 HTTPS configurado com sucesso!", False),
+    'remove-origin': ([
+        'git remote remove origin',
+        'git remote -v',
+        'echo "Origin removido! Pronto para novo repositório."'
+    ], "🗑️ Origin removido!", False),
+    'undo-commit': ([
+        'git reset --soft HEAD~1',
+        'git status'
+    ], "↩️ Último commit desfeito!", False),
+    'reset': ([
+        'git reset --hard HEAD',
+        'git clean -fd',
+        'git status'
+    ], "🔄 Reset executado!", True),
+    'force-push': ([
+        'git push --progress --force-with-lease origin main',
+        'echo "Push forçado concluído!"'
+    ], "💪 Push forçado executado!", True),
+}
+
+# Otimizar: mede status/add, aplica manutenção e ajustes de escala (reversíveis) e mede de novo
+TUNING_RUNS = 3
+TUNING_BACKUP_FILE = "gitpilot_tuning.json"
+TUNING_SETTINGS = [
+    ('core.commitGraph', 'true'),
+    ('fetch.writeCommitGraph', 'true'),
+    ('core.multiPackIndex', 'true'),
+    ('index.version', '4'),
+    ('core.untrackedCache', 'true'),
+    ('feature.manyFiles', 'true'),
+]
+TUNING_MAINTENANCE = [
+    ['maintenance', 'run', '--task=loose-objects'],
+    ['maintenance', 'run', '--task=incremental-repack'],
+    ['maintenance', 'run', '--task=commit-graph'],
+]
+TUNING_BENCH = {'status': ['status', '--porcelain'], 'add -n': ['add', '-n', '.']}
+
+def benchmark_repo(folder, runs=TUNING_RUNS, cancel_event=None):
+    """Mediana (s) de 'git status' e 'git add -n .' depois de uma execução de aquecimento"""
+    result = {}
+    for name, args in TUNING_BENCH.items():
+        run_git(args, folder, timeout=command_timeout('git add'), cancel_event=cancel_event)
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            run_git(args, folder, timeout=command_timeout('git add'), cancel_event=cancel_event)
+            times.append(time.perf_counter() - start)
+        result[name] = round(percentile(sorted(times), 50), 4)
+    return result
+
+def fsmonitor_supported(folder):
+    """O daemon fsmonitor embutido (git 2.36+, Windows e macOS) existe nesta plataforma?"""
+    result = run_git(['fsmonitor--daemon', 'status'], folder)
+    return not any(text in result.stderr for text in ('not supported', 'not a git command'))
+
+def read_index_version(folder):
+    """Versão do arquivo de índice (2, 3 ou 4), lida do cabeçalho; None sem índice"""
+    try:
+        with open(os.path.join(GitRepoReader(folder).git_dir, 'index'), 'rb') as f:
+            header = f.read(8)
+    except OSError:
+        return None
+    return struct.unpack('>I', header[4:8])[0] if header[:4] == b'DIRC' else None
+
+def tuning_backup_path(folder):
+    return os.path.join(GitRepoReader(folder).git_dir, TUNING_BACKUP_FILE)
+
+def tune_repository(folder, on_step=None, cancel_event=None):
+    """Aplica TUNING_SETTINGS (e o fsmonitor quando existe) guardando os valores anteriores em .git,
+    depois roda a manutenção; retorna [(passo, ok, detalhe)]. Desfazer: revert_tuning"""
+    steps = []
+    
+    def step(name, ok, detail=''):
+        steps.append((name, ok, detail))
+        if on_step:
+            on_step(name, ok, detail)
+            
+    settings = list(TUNING_SETTINGS)
+    if fsmonitor_supported(folder):
+        settings.append(('core.fsmonitor', 'true'))
+    else:
+        step('core.fsmonitor', False, "fsmonitor embutido indisponível nesta plataforma/versão do git")
+        
+    # O backup guarda o estado de antes da primeira otimização (rodar de novo não o sobrescreve)
+    backup_path = tuning_backup_path(folder)
+    try:
+        with open(backup_path, 'r', encoding='utf-8') as f:
+            backup = json.load(f)
+    except (OSError, ValueError):
+        backup = {'config': {}, 'index_version': read_index_version(folder)}
+    for key, value in settings:
+        if key not in backup['config']:
+            current = run_git(['config', '--local', '--get', key], folder)
+            backup['config'][key] = current.stdout.strip() if current.returncode == 0 else None
+    with open(backup_path, 'w', encoding='utf-8') as f:
+        json.dump(backup, f, indent=2)
+        
+    for key, value in settings:
+        result = run_git(['config', '--local', key, value], folder, cancel_event=cancel_event)
+        step(f"{key}={value}", result.returncode == 0, result.stderr.strip())
+    # index.version e untrackedCache só valem quando o índice é regravado
+    result = run_git(['update-index', '--index-version', '4', '--untracked-cache'], folder,
+                     timeout=command_timeout('git add'), cancel_event=cancel_event)
+    step('índice v4 + untracked cache', result.returncode == 0, result.stderr.strip())
+    for args in TUNING_MAINTENANCE:
+        result = run_git(args, folder, timeout=command_timeout('git push'), cancel_event=cancel_event)
+        lines = result.stderr.strip().splitlines()
+        step(f"manutenção: {args[2].split('=')[1]}", result.returncode == 0, lines[-1] if lines else '')
+    return steps
+
+def revert_tuning(folder, cancel_event=None):
+    """Volta as configurações e a versão do índice ao que eram antes de tune_repository.
+    Commit-graph e multi-pack-index ficam: são só caches, o git funciona igual sem ou com eles"""
+    backup_path = tuning_backup_path(folder)
+    try:
+        with open(backup_path, 'r', encoding='utf-8') as f:
+            backup = json.load(f)
+    except (OSError, ValueError):
+        raise RuntimeError("Nenhuma otimização registrada neste repositório")
+    steps = []
+    if 'core.fsmonitor' in backup['config']:
+        run_git(['fsmonitor--daemon', 'stop'], folder)
+    for key, previous in backup['config'].items():
+        if previous is None:
+            result = run_git(['config', '--local', '--unset', key], folder)
+            ok = result.returncode in (0, 5)  # 5 = já não estava definido
+        else:
+            result = run_git(['config', '--local', key, previous], folder)
+            ok = result.returncode == 0
+        steps.append((f"{key} -> {previous if previous is not None else '(padrão)'}", ok, result.stderr.strip()))
+    if backup.get('index_version'):
+        args = ['update-index', '--index-version', str(backup['index_version'])]
+        if backup['config'].get('core.untrackedCache') is None:
+            args.append('--no-untracked-cache')
+        result = run_git(args, folder, timeout=command_timeout('git add'), cancel_event=cancel_event)
+        steps.append((f"índice v{backup['index_version']}", result.returncode == 0, result.stderr.strip()))
+    os.remove(backup_path)
+    return steps
+
+def format_speedup(before, after):
+    """Antes/depois de cada operação medida"""
+    return '\n'.join(f"{name}: {before[name] * 1000:.0f} ms -> {after[name] * 1000:.0f} ms "
+                     f"({before[name] / after[name] if after[name] else 0:.1f}x)" for name in before)
+
+# Benchmark ponta a ponta: árvores sintéticas + repositório bare local como origin
+BENCH_SIZES = [100, 10000, 100000]
+BENCH_BACKENDS = ['subprocess', 'asyncio', 'pyautogui']
+BENCH_LARGE_EVERY = 1000              # 1 blob grande a cada N arquivos
+BENCH_LARGE_BYTES = 2 * 1024 * 1024
+BENCH_CHANGED_FRACTION = 0.01         # arquivos alterados antes do fluxo Atualizar
+
+def build_synthetic_tree(folder, files, large_every=BENCH_LARGE_EVERY, large_bytes=BENCH_LARGE_BYTES):
+    """Cria 'files' arquivos (texto pequeno, com um blob binário grande a cada 'large_every')"""
+    per_dir = 500
+    for i in range(files):
+        subdir = os.path.join(folder, f"pkg{i // per_dir:04d}")
+        if i % per_dir == 0:
+            os.makedirs(subdir, exist_ok=True)
+        if large_every and i % large_every == large_every - 1:
+            with open(os.path.join(subdir, f"blob{i:06d}.bin"), 'wb') as f:
+                f.write(os.urandom(large_bytes))
+        else:
+            with open(os.path.join(subdir, f"mod{i:06d}.py"), 'w', encoding='utf-8') as f:
+                f.write(f"# arquivo {i}\n" + f"VALOR_{i} = {i}\n" * (8 + i % 64))
+
+def touch_synthetic_tree(folder, files, fraction=BENCH_CHANGED_FRACTION):
+    """Altera uma fração dos arquivos pequenos e cria alguns novos (entrada do fluxo Atualizar)"""
+    changed = max(1, int(files * fraction))
+    for i in range(0, files, max(1, files // changed)):
+        path = os.path.join(folder, f"pkg{i // 500:04d}", f"mod{i:06d}.py")
+        if os.path.exists(path):
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(f"ALTERADO_{i} = True\n")
+    for i in range(changed):
+        with open(os.path.join(folder, f"novo{i:05d}.txt"), 'w', encoding='utf-8') as f:
+            f.write(f"novo {i}\n")
+
+def run_async_commands(commands, cwd=None):
+    """Executa a lista no AsyncJobEngine e espera terminar; retorna os passos como run_commands"""
+    engine = AsyncJobEngine()
+    steps = []
+    finished = threading.Event()
+    
+    def on_command(cmd, folder, code, seconds):
+        steps.append({'step': len(steps) + 1, 'command': cmd, 'returncode': code, 'seconds': round(seconds, 3)})
+        
+    engine.submit(commands, cwd, lambda job_id, text: None, lambda job_id, result: finished.set(), on_command)
+    finished.wait()
+    engine.loop.call_soon_threadsafe(engine.loop.stop)
+    return steps
+
+def keystroke_overhead(commands, direct=False, delay=DEFAULT_COMMAND_DELAY):
+    """Espera fixa do modo Git Bash sem marcadores: contagem de 5s + pausas de digitação + espera por comando
+    (mesmas regras de run_job/type_command_clipboard/type_command_direct/wait_command)"""
+    pauses = TYPING_PAUSES['direct' if direct else 'clipboard']
+    typing = sum(len(cmd) * TYPING_INTERVAL for cmd in commands) if direct else 0.0
+    return 5 + sum(pauses + fixed_command_wait(cmd, delay) for cmd in commands) + typing
+
+def peak_memory_kb():
+    """Pico de memória (KB) deste processo e dos filhos já encerrados; None onde não há 'resource'"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1024 if sys.platform == 'darwin' else 1  # macOS reporta em bytes
+    return {'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+            'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale}
+
+def bench_single(backend, files, base):
+    """Um ponto do benchmark: publica e atualiza uma árvore sintética; roda num processo próprio
+    para que o pico de memória seja só dele"""
+    folder = os.path.join(base, f"tree_{backend}_{files}")
+    origin = os.path.join(base, f"origin_{backend}_{files}.git")
+    build_synthetic_tree(folder, files)
+    run_git(['init', '-q', '--bare', origin], base)
+    execute = run_async_commands if backend == 'asyncio' else run_commands
+    runs = []
+    
+    def flow(name, commands):
+        start = time.perf_counter()
+        steps = execute(commands, folder)
+        runs.append({'backend': backend, 'files': files, 'flow': name,
+                     'wall_seconds': round(time.perf_counter() - start, 3),
+                     'ok': all(step['returncode'] == 0 for step in steps),
+                     'steps': [{key: step[key] for key in ('command', 'seconds', 'returncode')} for step in steps]})
+        
+    plan = build_publish_plan(origin, "Benchmark", folder)
+    flow('publish', resolve_plan(plan, probe_repo_state(folder))[0])
+    touch_synthetic_tree(folder, files)
+    flow('update', build_update_commands("Benchmark update"))
+    memory = peak_memory_kb()
+    for run in runs:
+        run['peak_memory_kb'] = memory
+    return runs
+
+def run_benchmark(sizes=BENCH_SIZES, backends=BENCH_BACKENDS, base=None, keep=False, on_result=None):
+    """Mede os fluxos Novo Projeto e Atualizar por backend e tamanho; retorna o relatório (dict)"""
+    # Pasta informada pelo usuário: apagar no fim só o que o benchmark criou dentro dela
+    own_base = not base
+    base = base or tempfile.mkdtemp(prefix='gitpilot_bench_')
+    created = []
+    with open(os.path.abspath(__file__), 'rb') as f:
+        script_hash = hashlib.sha256(f.read()).hexdigest()[:12]
+    report = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'script_sha256': script_hash,
+        'git': run_git(['--version'], base).stdout.strip(),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'results': [],
+    }
+    try:
+        for files in sizes:
+            reference = None
+            for backend in backends:
+                if backend == 'pyautogui':
+                    # Precisa de tela e Git Bash em foco: registra só a espera fixa que ele somaria
+                    for run in reference or []:
+                        commands = [step['command'] for step in run['steps']]
+                        report['results'].append({
+                            'backend': backend, 'files': files, 'flow': run['flow'], 'skipped': True,
+                            'estimated_fixed_wait_seconds': round(keystroke_overhead(commands), 1),
+                            'estimated_wall_seconds': round(run['wall_seconds'] + keystroke_overhead(commands), 1)})
+                    continue
+                for path in (os.path.join(base, f"tree_{backend}_{files}"),
+                             os.path.join(base, f"origin_{backend}_{files}.git")):
+                    if not os.path.exists(path):
+                        created.append(path)
+                proc = subprocess.run([sys.executable, os.path.abspath(__file__), 'bench',
+                                       '--single', f"{backend}:{files}", '--base', base],
+                                      cwd=base, capture_output=True, text=True, encoding='utf-8', errors='replace')
+                if proc.returncode != 0:
+                    runs = [{'backend': backend, 'files': files, 'error': proc.stderr.strip()[-500:]}]
+                else:
+                    runs = json.loads(proc.stdout)
+                    if backend == 'subprocess':
+                        reference = runs
+                for run in runs:
+                    report['results'].append(run)
+                    if on_result:
+                        on_result(run)
+    finally:
+        if not keep:
+            for path in [base] if own_base else created:
+                shutil.rmtree(path, ignore_errors=True)
+    return report
+
+# Linha de comando: python GITPILOT_ALTO.py publish|update|status|fix|mirror|bench ... (saída JSON, sem tkinter)
+CLI_ACTIONS = ('publish', 'update', 'clone', 'preflight', 'tune', 'stage', 'status', 'fix', 'mirror', 'bench')
+
+def cli_main(argv):
+    """Modo sem interface: usa o backend subprocess e imprime o resultado em JSON"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='gitpilot', description="Git Automatizador sem interface gráfica")
+    actions = parser.add_subparsers(dest='action', required=True)
+    
+    publish = actions.add_parser('publish', help="publica um novo projeto (init, commit, remote, push)")
+    publish.add_argument('--folder', default='.')
+    publish.add_argument('--repo', required=True, help="URL do repositório (ou pasta de um repo bare)")
+    publish.add_argument('-m', '--message', default="Primeiro commit")
+    publish.add_argument('--keep-origin', action='store_true', help="não remove o origin existente")
+    publish.add_argument('--gitignore', action='store_true', help="gera o .gitignore analisando a pasta")
+    publish.add_argument('--force', action='store_true', help="push com --force")
+    publish.add_argument('--no-preflight', action='store_true', help="não para nos erros do pré-voo")
+    publish.add_argument('--parallel-add', action='store_true', help="'git add .' em lotes paralelos (árvores grandes)")
+    publish.add_argument('--dry-run', action='store_true', help="mostra o plano (e os passos já satisfeitos) sem executar")
+    publish.add_argument('--large-files', choices=['abort', 'lfs', 'gitignore', 'allow'], default='abort',
+                         help=f"o que fazer com arquivos acima de {LARGE_FILE_LIMIT_MB} MB")
+    
+    update = actions.add_parser('update', help="add/commit/push em um ou vários repositórios em paralelo")
+    update.add_argument('folders', nargs='*', default=['.'])
+    update.add_argument('-m', '--message', default="Atualização")
+    update.add_argument('--workers', type=int, default=BATCH_WORKERS)
+    update.add_argument('--no-skip', action='store_true', help="não pula repositórios sem mudanças")
+    
+    clone = actions.add_parser('clone', help="clone parcial (sem blobs), raso e/ou esparso, com economia medida")
+    clone.add_argument('repo', help="URL do repositório (ou pasta de um repo bare)")
+    clone.add_argument('dest')
+    clone.add_argument('--full', action='store_true', help="com blobs (sem --filter=blob:none)")
+    clone.add_argument('--depth', type=int, help="histórico raso com N commits")
+    clone.add_argument('--sparse', nargs='+', default=[], metavar='PASTA', help="sparse-checkout só destas pastas")
+    clone.add_argument('--branch')
+    clone.add_argument('--compare', action='store_true', help="mede também um clone completo para comparar")
+    
+    preflight = actions.add_parser('preflight', help="verificações do Novo Projeto, todas em paralelo")
+    preflight.add_argument('--folder', default='.')
+    preflight.add_argument('--repo', required=True, help="URL do repositório (ou pasta de um repo bare)")
+    
+    stage = actions.add_parser('stage', help="'git add .' em lotes paralelos, retomável após interrupção")
+    stage.add_argument('--folder', default='.')
+    stage.add_argument('--workers', type=int, help="padrão: número de CPUs")
+    stage.add_argument('--chunk', type=int, default=STAGE_CHUNK_FILES, help="arquivos por lote")
+    
+    status = actions.add_parser('status', help="branches, remotes, upstream e últimos commits (lidos do .git)")
+    status.add_argument('--folder', default='.')
+    status.add_argument('-n', type=int, default=5, help="quantidade de commits")
+    
+    tune = actions.add_parser('tune', help="mede status/add, aplica ajustes de desempenho reversíveis e mede de novo")
+    tune.add_argument('--folder', default='.')
+    tune.add_argument('--revert', action='store_true', help="volta as configurações de antes")
+    tune.add_argument('--runs', type=int, default=TUNING_RUNS, help="execuções por medição (mediana)")
+    
+    fix = actions.add_parser('fix', help="correções rápidas")
+    fix.add_argument('name', choices=sorted(FIX_COMMANDS))
+    fix.add_argument('--folder', default='.')
+    fix.add_argument('--yes', action='store_true', help="confirma correções destrutivas (reset, force-push)")
+    
+    mirror = actions.add_parser('mirror', help="push do branch atual para vários remotes em paralelo")
+    mirror.add_argument('remotes', nargs='+', help="nome (remote existente) ou nome=url")
+    mirror.add_argument('--folder', default='.')
+    mirror.add_argument('--branch', help="padrão: branch atual")
+    
+    bench = actions.add_parser('bench', help="benchmark dos fluxos Novo Projeto/Atualizar com origin bare local")
+    bench.add_argument('--sizes', type=int, nargs='+', default=BENCH_SIZES, help="quantidade de arquivos")
+    bench.add_argument('--backends', nargs='+', choices=BENCH_BACKENDS, default=BENCH_BACKENDS)
+    bench.add_argument('--output', help="grava o relatório JSON neste arquivo (além de imprimir)")
+    bench.add_argument('--base', help="pasta de trabalho (padrão: temporária)")
+    bench.add_argument('--keep', action='store_true', help="mantém as árvores e os origins gerados")
+    bench.add_argument('--single', help=argparse.SUPPRESS)  # backend:arquivos, usado pelo processo filho
+    
+    args = parser.parse_args(argv)
+    
+    if args.action == 'bench':
+        if args.single:
+            backend, files = args.single.split(':')
+            print(json.dumps(bench_single(backend, int(files), args.base), ensure_ascii=False))
+            return 0
+        report = run_benchmark(args.sizes, args.backends, args.base, args.keep,
+                               on_result=lambda run: print(f"{run['backend']:>10} {run['files']:>7} "
+                                                           f"{run.get('flow', '-'):>8} "
+                                                           f"{run.get('wall_seconds', '-')}s", file=sys.stderr))
+        text = json.dumps(report, ensure_ascii=False, indent=2)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text)
+        print(text)
+        return 0 if all(run.get('ok', run.get('skipped')) for run in report['results']) else 1
+    start = time.time()
+    output = {'action': args.action}
+    
+    try:
+        if args.action == 'publish':
+            folder = os.path.abspath(args.folder)
+            repo = normalize_repo_url(args.repo)
+            if args.gitignore:
+                proposal = propose_gitignore(folder)
+                if args.dry_run:
+                    output['gitignore_rules'] = [rule for rule, _, _, _ in proposal['rules']]
+                else:
+                    output['gitignore_rules'] = write_gitignore(folder, proposal)
+            limit = LARGE_FILE_LIMIT_MB * 1024 * 1024
+            output['preflight'] = run_preflight(folder, repo, limit)
+            if not args.no_preflight and not args.dry_run and any(
+                    item['status'] == 'erro' for item in output['preflight']):
+                output['ok'] = False
+                output['error'] = "o pré-voo encontrou erros (use --no-preflight para publicar mesmo assim)"
+                print(json.dumps(output, ensure_ascii=False, indent=2))
+                return 4
+            too_big = [rel for rel, _ in find_large_files(folder, limit)]
+            output['large_files'] = too_big
+            before_add = []
+            if too_big and args.large_files == 'abort':
+                output['ok'] = False
+                output['error'] = "arquivos acima do limite (use --large-files lfs|gitignore|allow)"
+                print(json.dumps(output, ensure_ascii=False, indent=2))
+                return 3
+            if too_big and args.large_files in ('lfs', 'gitignore'):
+                before_add = large_file_commands(folder, too_big, args.large_files, write=not args.dry_run)
+            plan = build_publish_plan(repo, args.message, folder, clean_remote=not args.keep_origin,
+                                      force=args.force, before_add=before_add)
+            if args.dry_run:
+                commands, skipped = resolve_plan(plan, probe_repo_state(folder))
+                output['skipped'] = [{'command': cmd, 'reason': reason} for cmd, reason in skipped]
+                output['plan'] = commands
+                output['ok'] = True
+                print(json.dumps(output, ensure_ascii=False, indent=2))
+                return 0
+            steps = run_commands(plan, folder, parallel_stage=args.parallel_add)
+            output['skipped'] = [{'command': step['command'], 'reason': step['skipped']}
+                                 for step in steps if 'skipped' in step]
+            output['steps'] = [step for step in steps if 'skipped' not in step]
+            # Os passos que podem falhar já têm guarda ('|| true'): qualquer outro código != 0 é falha
+            output['ok'] = all(step['returncode'] == 0 for step in output['steps'])
+            
+        elif args.action == 'update':
+            folders = [os.path.abspath(folder) for folder in args.folders]
+            results, _ = update_repositories(folders, args.message, args.workers,
+                                             skip_unchanged=not args.no_skip)
+            output['results'] = sorted(results, key=lambda r: r['repo'])
+            output['ok'] = all(r['status'] != 'falhou' for r in results)
+            
+        elif args.action == 'mirror':
+            remotes = {}
+            for item in args.remotes:
+                name, _, url = item.partition('=')
+                remotes[name] = url or None
+            results, elapsed = push_mirrors(os.path.abspath(args.folder), remotes, args.branch)
+            output['results'] = sorted(results, key=lambda r: r['remote'])
+            output['ok'] = all(r['status'] == 'enviado' for r in results)
+            
+        elif args.action == 'clone':
+            result = clone_repository(args.repo, args.dest, blobless=not args.full, depth=args.depth,
+                                      sparse_paths=args.sparse, branch=args.branch)
+            reference = measure_full_clone(args.repo) if args.compare else load_clone_reference(args.repo)
+            output['clone'] = result
+            output['full_clone'] = reference
+            output['summary'] = format_clone_savings(result, reference)
+            output['ok'] = True
+            
+        elif args.action == 'preflight':
+            start_checks = time.time()
+            output['checks'] = run_preflight(os.path.abspath(args.folder), normalize_repo_url(args.repo))
+            output['checks_seconds'] = round(time.time() - start_checks, 3)
+            print(format_preflight(output['checks']), file=sys.stderr)
+            output['ok'] = not any(item['status'] == 'erro' for item in output['checks'])
+            
+        elif args.action == 'stage':
+            def progress(files, total, done_bytes, total_bytes, seconds):
+                print(f"{files}/{total} arquivos, {files / max(seconds, 1e-6):.0f} arquivos/s, "
+                      f"{format_size(done_bytes / max(seconds, 1e-6))}/s", file=sys.stderr)
+            output['stage'] = stage_parallel(os.path.abspath(args.folder), args.workers, args.chunk,
+                                             on_progress=progress)
+            output['ok'] = True
+            
+        elif args.action == 'status':
+            reader = GitRepoReader(args.folder)
+            output['status'] = reader.status(limit=args.n)
+            reader.close()
+            output['ok'] = True
+            
+        elif args.action == 'tune':
+            folder = os.path.abspath(args.folder)
+            if args.revert:
+                steps = revert_tuning(folder)
+            else:
+                output['before'] = benchmark_repo(folder, args.runs)
+                steps = tune_repository(folder)
+                output['after'] = benchmark_repo(folder, args.runs)
+                print(format_speedup(output['before'], output['after']), file=sys.stderr)
+            output['steps'] = [{'step': name, 'ok': ok, 'detail': detail} for name, ok, detail in steps]
+            output['ok'] = True
+            
+        elif args.action == 'fix':
+            commands, success_msg, destructive = FIX_COMMANDS[args.name]
+            if destructive and not args.yes:
+                output['ok'] = False
+                output['error'] = "correção destrutiva: confirme com --yes"
+                print(json.dumps(output, ensure_ascii=False, indent=2))
+                return 2
+            output['steps'] = run_commands(commands, os.path.abspath(args.folder))
+            output['ok'] = all(step['returncode'] == 0 for step in output['steps'])
+            if output['ok']:
+                output['message'] = success_msg
+    except (OSError, RuntimeError) as e:
+        output['ok'] = False
+        output['error'] = str(e)
+        
+    output['seconds'] = round(time.time() - start, 3)
+    print(json.dumps(output, ensure_ascii=False, indent=2))
+    return 0 if output['ok'] else 1
+
+# Interface grafica: tkinter so e importado no modo janela (a linha de comando nao precisa dele)
+tk = ttk = filedialog = messagebox = scrolledtext = None
+
+def load_tkinter():
+    """Importa tkinter sob demanda"""
+    global tk, ttk, filedialog, messagebox, scrolledtext
+    try:
+        import tkinter
+        from tkinter import ttk as tk_ttk, filedialog as tk_filedialog
+        from tkinter import messagebox as tk_messagebox, scrolledtext as tk_scrolledtext
+    except ImportError as e:
+        print(f"ERRO ao importar: {e}")
+        print("Instale o Python com suporte a Tkinter")
+        input("Pressione Enter para sair...")
+        sys.exit(1)
+    tk, ttk, filedialog = tkinter, tk_ttk, tk_filedialog
+    messagebox, scrolledtext = tk_messagebox, tk_scrolledtext
 
 class GitAutomator:
     def __init__(self):
+        load_tkinter()
         self.root = tk.Tk()
         self.root.title("Git Automatizador Pro v3.2 - PROBLEMAS RESOLVIDOS")
         self.root.geometry("950x800")
         self.root.configure(bg='#1e1e1e')
         
-        # Configuracoes do pyautogui CRUCIAIS
-        pyautogui.FAILSAFE = True
-        pyautogui.PAUSE = 0.1  # Pausa entre acoes
-        
         # Variaveis
-        self.is_running = False
         self.current_commands = []
-        self.config_file = "git_automator_config.json"
-        self.delay_between_commands = 2.5  # Aumentado para dar tempo ao Git
+        self.config_file = CONFIG_FILE
+        self.delay_between_commands = DEFAULT_COMMAND_DELAY  # Aumentado para dar tempo ao Git
         self.use_clipboard_method = tk.BooleanVar(value=True)
+        self.marker_file = None  # Arquivo onde o Git Bash sinaliza o fim de cada comando
+        self.marker_offset = 0
+        self.log_queue = queue.Queue()  # log() pode ser chamado de qualquer thread
+        self.ui_calls = queue.Queue()  # Atualizações de widgets pedidas pelas threads
+        # Fila de jobs (a interface só é redesenhada na thread dela)
+        self.job_queue = JobQueue(on_change=lambda: self.run_in_ui(self.refresh_queue_panel))
+        self.async_engine = None  # Criado no primeiro job do backend asyncio
+        self.engine_lock = threading.Lock()
+        self.watcher = None
+        self.file_logger = None
         
         # Carregar configuracoes
         self.load_config()
+        self.backend_var = tk.StringVar(value=self.config.get('backend', 'subprocess'))
+        self.wait_marker_var = tk.BooleanVar(value=self.config.get('wait_marker', True))
+        self.single_paste_var = tk.BooleanVar(value=self.config.get('single_paste', False))
+        self.parallel_stage_var = tk.BooleanVar(value=self.config.get('parallel_stage', False))
+        self.log_to_file_var = tk.BooleanVar(value=self.config.get('log_to_file', False))
+        self.toggle_log_file()
         
         # Criar interface
         self.setup_ui()
         
-    def load_config(self):
-        """Carrega configuracoes salvas"""
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    self.config = json.load(f)
-            else:
-                self.config = {
-                    'git_name': '',
-                    'git_email': '',
-                    'last_folder': '',
-                    'last_repo': '',
-                    'use_clipboard': True
-                }
-        except:
-            self.config = {'use_clipboard': True}
-    
-    def save_config(self):
-        """Salva configuracoes"""
-        try:
-            self.config['use_clipboard'] = self.use_clipboard_method.get()
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2)
-        except:
-            pass
+    def load_config(self):
+        """Carrega configuracoes salvas"""
+        self.config = ConfigStore(self.config_file,
+                                  on_error=lambda e: self.log(f"⚠️ Não foi possível salvar a configuração: {e}"))
+    
+    def save_config(self):
+        """Salva configuracoes (gravação agrupada, fora da thread da interface)"""
+        self.config['use_clipboard'] = self.use_clipboard_method.get()
+        self.config['backend'] = self.backend_var.get()
+        self.config['wait_marker'] = self.wait_marker_var.get()
+        self.config['single_paste'] = self.single_paste_var.get()
+        self.config['parallel_stage'] = self.parallel_stage_var.get()
+        self.config['log_to_file'] = self.log_to_file_var.get()
+        self.config['skip_noop'] = self.skip_noop_var.get()
+        self.config['large_check'] = self.large_check_var.get()
+        self.config['preflight'] = self.preflight_var.get()
+        self.config.save()
+        
+    def apply_profile(self):
+        """Carrega o perfil da pasta escolhida (URL, backend, tempo entre comandos, último resultado)"""
+        folder = self.folder_var.get().strip()
+        profile = self.config.profile(folder) if folder else {}
+        if not profile:
+            return
+        self.repo_var.set(profile.get('repo', ''))
+        self.mirrors_var.set(format_mirrors(profile.get('mirrors', {})))
+        self.backend_var.set(profile.get('backend', self.backend_var.get()))
+        self.delay_between_commands = profile.get('delay_between_commands', self.delay_between_commands)
+        self.log(f"📁 Perfil carregado: {folder} -> {profile.get('repo') or 'sem URL'}")
+        last = profile.get('last_result')
+        if last:
+            self.log(f"   Último resultado: {'✅' if last['ok'] else '⚠️'} {last['action']} em {last['time']} "
+                     f"({last['seconds']:.1f}s)")
+            
+    def with_mirrors(self, commands, folder, on_success=None, upstream=False, force=False):
+        """Com espelhos configurados, o push do origin (último comando) passa a sair junto com os dos
+        espelhos, em paralelo e com o mesmo --force; retorna (comandos, on_success). O on_success
+        devolvido retorna quantos pushes falharam, que o job soma às falhas"""
+        mirrors = parse_mirrors(self.mirrors_var.get())
+        if folder:
+            self.config.update_profile(folder, mirrors=mirrors)
+        if not mirrors or not folder or not os.path.isdir(folder):
+            return commands, on_success
+            
+        if self.backend_var.get() == 'pyautogui':
+            # Sem códigos de saída confiáveis: pushes em sequência depois do origin
+            extra = []
+            for name, url in mirrors.items():
+                extra.append(f'git remote add {name} {url} 2>/dev/null || git remote set-url {name} {url}')
+                extra.append(f'git push --progress{" --force" if force else ""} {name} HEAD')
+            return commands + extra, on_success
+            
+        remotes = dict({'origin': None}, **mirrors)
+        
+        def push_all(job):
+            self.log(f"🪞 Push em paralelo para {len(remotes)} remotes: {', '.join(remotes)}")
+            
+            def on_result(result):
+                retries = f", {result['attempts']} tentativas" if result['attempts'] > 1 else ""
+                if result['status'] == 'enviado':
+                    self.log(f"   ✓ {result['remote']} ({result['seconds']:.2f}s{retries})")
+                else:
+                    self.log(f"   ❌ {result['remote']}: {result['detail']} ({result['seconds']:.2f}s{retries})")
+                    
+            try:
+                results, elapsed = push_mirrors(folder, remotes, upstream='origin' if upstream else None,
+                                                on_result=on_result, force=force,
+                                                cancel_event=job.cancel_event)
+            except (OSError, RuntimeError) as e:
+                self.log(f"❌ Espelhos: {e}")
+                return len(remotes)
+            failed = [r['remote'] for r in results if r['status'] != 'enviado']
+            slowest = max(r['seconds'] for r in results)
+            self.log(f"🪞 {len(results) - len(failed)}/{len(results)} remotes em {elapsed:.2f}s "
+                     f"(mais lento: {slowest:.2f}s, soma: {sum(r['seconds'] for r in results):.2f}s)")
+            if not failed and on_success:
+                on_success(job)
+            return len(failed)
+                
+        return commands[:-1], push_all
+        
+    def remember_result(self, folder, action, ok, seconds):
+        """Guarda no perfil da pasta o resultado da última execução"""
+        if folder:
+            self.config.update_profile(folder, last_result={'action': action, 'ok': ok, 'seconds': round(seconds, 2),
+                                                            'time': time.strftime('%Y-%m-%d %H:%M')})
     
     def setup_ui(self):
         """Configura interface"""
@@ -127,10 +3165,13 @@ class GitAutomator:
         # Abas
         self.setup_new_project_tab(notebook)
         self.setup_update_tab(notebook)
+        self.setup_clone_tab(notebook)
         self.setup_fix_tab(notebook)
         self.setup_config_tab(notebook)
+        self.setup_performance_tab(notebook)
         
-        # Log
+        # Fila e log
+        self.setup_queue_section(main_frame)
         self.setup_log_section(main_frame)
         
     def setup_new_project_tab(self, notebook):
@@ -144,17 +3185,22 @@ class GitAutomator:
         
         # Pasta
         ttk.Label(fields, text="Pasta do Projeto:").grid(row=0, column=0, sticky='w', pady=5)
-        self.folder_var = tk.StringVar(value=self.config.get('last_folder', ''))
+        recent = self.config.recent_folders()
+        self.folder_var = tk.StringVar(value=recent[0] if recent else '')
         folder_frame = tk.Frame(fields)
         folder_frame.grid(row=0, column=1, sticky='ew', padx=10, pady=5)
         
-        self.folder_entry = ttk.Entry(folder_frame, textvariable=self.folder_var, width=50)
+        # Pastas recentes: escolher uma carrega o perfil dela
+        self.folder_entry = ttk.Combobox(folder_frame, textvariable=self.folder_var, width=50,
+                                         postcommand=lambda: self.folder_entry.config(
+                                             values=self.config.recent_folders()))
         self.folder_entry.pack(side='left', fill='x', expand=True)
+        self.folder_entry.bind('<<ComboboxSelected>>', lambda e: self.apply_profile())
         ttk.Button(folder_frame, text="Procurar", command=self.select_folder).pack(side='right', padx=5)
         
         # URL
         ttk.Label(fields, text="URL do GitHub:").grid(row=1, column=0, sticky='w', pady=5)
-        self.repo_var = tk.StringVar(value=self.config.get('last_repo', ''))
+        self.repo_var = tk.StringVar(value=self.config.profile(recent[0]).get('repo', '') if recent else '')
         self.repo_entry = ttk.Entry(fields, textvariable=self.repo_var, width=60)
         self.repo_entry.grid(row=1, column=1, sticky='ew', padx=10, pady=5)
         
@@ -167,6 +3213,13 @@ class GitAutomator:
         self.commit_var = tk.StringVar(value="Primeiro commit")
         ttk.Entry(fields, textvariable=self.commit_var, width=60).grid(row=2, column=1, sticky='ew', padx=10, pady=5)
         
+        # Espelhos (remotes extras recebem o mesmo push, em paralelo)
+        ttk.Label(fields, text="Espelhos:").grid(row=3, column=0, sticky='w', pady=5)
+        self.mirrors_var = tk.StringVar(value=format_mirrors(self.config.profile(recent[0]).get('mirrors', {}))
+                                        if recent else '')
+        ttk.Entry(fields, textvariable=self.mirrors_var, width=60).grid(row=3, column=1, sticky='ew', padx=10, pady=5)
+        ttk.Label(fields, text="nome=url, ...").grid(row=3, column=2, padx=5)
+        
         fields.grid_columnconfigure(1, weight=1)
         
         # Opcoes
@@ -174,7 +3227,11 @@ class GitAutomator:
         options.pack(fill='x', pady=5, padx=10)
         
         self.gitignore_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(options, text="Criar .gitignore básico", variable=self.gitignore_var).pack(anchor='w')
+        gitignore_frame = tk.Frame(options)
+        gitignore_frame.pack(anchor='w')
+        ttk.Checkbutton(gitignore_frame, text="Criar .gitignore (analisa a pasta do projeto)",
+                       variable=self.gitignore_var).pack(side='left')
+        ttk.Button(gitignore_frame, text="Ver sugestão", command=self.preview_gitignore).pack(side='left', padx=10)
         
         # NOVA OPÇÃO: Limpeza automática
         self.clean_remote_var = tk.BooleanVar(value=True)
@@ -184,6 +3241,15 @@ class GitAutomator:
         self.force_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(options, text="Push forçado (--force)", variable=self.force_var).pack(anchor='w')
         
+        self.large_check_var = tk.BooleanVar(value=self.config.get('large_check', True))
+        ttk.Checkbutton(options, text=f"Verificar arquivos grandes antes do commit "
+                       f"(limite {self.config.get('large_file_limit_mb', LARGE_FILE_LIMIT_MB)} MB: Git LFS ou .gitignore)",
+                       variable=self.large_check_var).pack(anchor='w')
+        self.preflight_var = tk.BooleanVar(value=self.config.get('preflight', True))
+        ttk.Checkbutton(options, text="Pré-voo: verificar git, identidade, remotes, branch, mudanças e acesso "
+                       "ao remoto (tudo em paralelo) antes de publicar",
+                       variable=self.preflight_var).pack(anchor='w')
+        
         # Método de digitação
         method_frame = tk.Frame(options)
         method_frame.pack(anchor='w', pady=5)
@@ -195,6 +3261,23 @@ class GitAutomator:
         ttk.Radiobutton(method_frame, text="Digitação direta", 
                        variable=self.use_clipboard_method, value=False).pack(side='left')
         
+        # Backend de execução
+        backend_frame = tk.Frame(options)
+        backend_frame.pack(anchor='w', pady=5)
+        tk.Label(backend_frame, text="Execução:", font=('Arial', 10, 'bold')).pack(side='left')
+        ttk.Radiobutton(backend_frame, text="Direta - subprocess (Rápido)",
+                       variable=self.backend_var, value='subprocess').pack(side='left', padx=10)
+        ttk.Radiobutton(backend_frame, text="Git Bash (pyautogui)",
+                       variable=self.backend_var, value='pyautogui').pack(side='left')
+        ttk.Radiobutton(backend_frame, text="Assíncrona (vários jobs, saída ao vivo)",
+                       variable=self.backend_var, value='asyncio').pack(side='left', padx=10)
+        ttk.Checkbutton(options, text="Git Bash: aguardar término de cada comando (em vez de espera fixa)",
+                       variable=self.wait_marker_var).pack(anchor='w')
+        ttk.Checkbutton(options, text="Git Bash: colar tudo de uma vez (script único)",
+                       variable=self.single_paste_var).pack(anchor='w')
+        ttk.Checkbutton(options, text="Direta: 'git add .' em lotes paralelos (árvores muito grandes, retomável)",
+                       variable=self.parallel_stage_var).pack(anchor='w')
+        
         # Botoes
         btn_frame = tk.Frame(tab)
         btn_frame.pack(pady=20)
@@ -216,6 +3299,11 @@ class GitAutomator:
                  bg='#ffff00', fg='black', font=('Arial', 12),
                  padx=20, pady=8).pack(side='left', padx=5)
         
+        tk.Button(btn_frame, text="Prévia (dry-run)", 
+                 command=self.preview_plan,
+                 bg='#2196F3', fg='white', font=('Arial', 12),
+                 padx=20, pady=8).pack(side='left', padx=5)
+        
     def setup_update_tab(self, notebook):
         """Aba atualizar projeto"""
         tab = ttk.Frame(notebook)
@@ -231,11 +3319,98 @@ class GitAutomator:
         self.update_msg_var = tk.StringVar(value="Atualização do projeto")
         ttk.Entry(info, textvariable=self.update_msg_var, width=50).pack(pady=5)
         
+        self.skip_noop_var = tk.BooleanVar(value=self.config.get('skip_noop', True))
+        ttk.Checkbutton(info, text="Pular commit/push se nada mudou (usa a pasta da aba Novo Projeto)",
+                       variable=self.skip_noop_var).pack()
+        
         tk.Button(info, text="ATUALIZAR PROJETO", 
                  command=self.start_update,
                  bg='#2196F3', fg='white', font=('Arial', 14, 'bold'),
                  padx=30, pady=10).pack(pady=20)
         
+        # Modo watch
+        watch_frame = tk.Frame(info)
+        watch_frame.pack()
+        ttk.Label(watch_frame, text="Aguardar sem mudanças (s):").pack(side='left')
+        self.watch_quiet_var = tk.IntVar(value=self.config.get('watch_quiet', WATCH_QUIET_SECONDS))
+        ttk.Spinbox(watch_frame, from_=1, to=600, textvariable=self.watch_quiet_var, width=5).pack(side='left', padx=5)
+        self.watch_btn = tk.Button(watch_frame, text="👁️ INICIAR WATCH", command=self.toggle_watch,
+                                   bg='#607D8B', fg='white', font=('Arial', 11, 'bold'), padx=15, pady=3)
+        self.watch_btn.pack(side='left', padx=10)
+        
+        # Atualização em lote
+        batch = ttk.LabelFrame(tab, text="Atualização em Lote (vários repositórios em paralelo)", padding=10)
+        batch.pack(fill='both', expand=True, pady=5, padx=20)
+        
+        root_frame = tk.Frame(batch)
+        root_frame.pack(fill='x')
+        ttk.Label(root_frame, text="Pasta raiz:").pack(side='left')
+        self.batch_root_var = tk.StringVar(value=self.config.get('batch_root', ''))
+        ttk.Entry(root_frame, textvariable=self.batch_root_var, width=40).pack(side='left', fill='x', expand=True, padx=5)
+        ttk.Button(root_frame, text="Procurar", command=self.select_batch_root).pack(side='left')
+        ttk.Button(root_frame, text="Buscar repositórios", command=self.scan_batch_root).pack(side='left', padx=5)
+        
+        ttk.Label(batch, text="Repositórios (um por linha):").pack(anchor='w', pady=(5, 0))
+        self.batch_text = tk.Text(batch, height=4, font=('Consolas', 9))
+        self.batch_text.pack(fill='x')
+        self.batch_text.insert('1.0', '\n'.join(self.config.get('batch_repos', [])))
+        
+        run_frame = tk.Frame(batch)
+        run_frame.pack(fill='x', pady=5)
+        ttk.Label(run_frame, text="Em paralelo:").pack(side='left')
+        self.batch_workers_var = tk.IntVar(value=self.config.get('batch_workers', BATCH_WORKERS))
+        ttk.Spinbox(run_frame, from_=1, to=64, textvariable=self.batch_workers_var, width=5).pack(side='left', padx=5)
+        self.batch_btn = tk.Button(run_frame, text="ATUALIZAR TODOS", command=self.start_batch_update,
+                                   bg='#2196F3', fg='white', font=('Arial', 11, 'bold'), padx=15, pady=3)
+        self.batch_btn.pack(side='left', padx=10)
+        
+        self.batch_tree = ttk.Treeview(batch, columns=('repo', 'status', 'time', 'detail'), show='headings', height=5)
+        for col, title, width in [('repo', 'Repositório', 260), ('status', 'Resultado', 120),
+                                  ('time', 'Tempo', 60), ('detail', 'Detalhe', 300)]:
+            self.batch_tree.heading(col, text=title)
+            self.batch_tree.column(col, width=width, anchor='w')
+        self.batch_tree.pack(fill='both', expand=True)
+        
+    def setup_clone_tab(self, notebook):
+        """Aba clonar (parcial, raso e esparso)"""
+        tab = ttk.Frame(notebook)
+        notebook.add(tab, text="Clonar")
+        
+        frame = ttk.LabelFrame(tab, text="Clonar Repositório", padding=20)
+        frame.pack(fill='x', pady=20, padx=20)
+        
+        ttk.Label(frame, text="URL do repositório (ou pasta de um repo bare):").grid(row=0, column=0, sticky='w')
+        self.clone_url_var = tk.StringVar(value=self.config.get('clone_url', ''))
+        ttk.Entry(frame, textvariable=self.clone_url_var, width=50).grid(row=0, column=1, padx=5, pady=5)
+        
+        ttk.Label(frame, text="Pasta de destino:").grid(row=1, column=0, sticky='w')
+        self.clone_dest_var = tk.StringVar(value=self.config.get('clone_dest', ''))
+        ttk.Entry(frame, textvariable=self.clone_dest_var, width=50).grid(row=1, column=1, padx=5, pady=5)
+        ttk.Button(frame, text="Procurar", command=self.select_clone_dest).grid(row=1, column=2)
+        
+        self.clone_blobless_var = tk.BooleanVar(value=self.config.get('clone_blobless', True))
+        ttk.Checkbutton(frame, text="Sem blobs (--filter=blob:none): conteúdo baixado só quando usado",
+                       variable=self.clone_blobless_var).grid(row=2, column=0, columnspan=3, sticky='w')
+        
+        depth_frame = tk.Frame(frame)
+        depth_frame.grid(row=3, column=0, columnspan=3, sticky='w', pady=5)
+        ttk.Label(depth_frame, text="Profundidade (--depth, 0 = histórico completo):").pack(side='left')
+        self.clone_depth_var = tk.IntVar(value=self.config.get('clone_depth', 0))
+        ttk.Spinbox(depth_frame, from_=0, to=100000, textvariable=self.clone_depth_var, width=7).pack(side='left', padx=5)
+        
+        ttk.Label(frame, text="Sparse-checkout (pastas separadas por vírgula, vazio = tudo):").grid(
+            row=4, column=0, sticky='w')
+        self.clone_sparse_var = tk.StringVar(value=self.config.get('clone_sparse', ''))
+        ttk.Entry(frame, textvariable=self.clone_sparse_var, width=50).grid(row=4, column=1, padx=5, pady=5)
+        
+        self.clone_compare_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frame, text="Medir também um clone completo (em pasta temporária) para comparar",
+                       variable=self.clone_compare_var).grid(row=5, column=0, columnspan=3, sticky='w')
+        
+        tk.Button(frame, text="CLONAR", command=self.start_clone,
+                 bg='#2196F3', fg='white', font=('Arial', 14, 'bold'),
+                 padx=30, pady=10).grid(row=6, column=0, columnspan=3, pady=20)
+        
     def setup_fix_tab(self, notebook):
         """Aba correções"""
         tab = ttk.Frame(notebook)
@@ -275,6 +3450,18 @@ class GitAutomator:
                  bg='#9C27B0', fg='white', font=('Arial', 11, 'bold'),
                  padx=15, pady=5).pack(side='left', padx=5)
         
+        # Desempenho do repositório (status/add lentos em repositórios grandes)
+        btns3 = tk.Frame(fixes)
+        btns3.pack(pady=5)
+        
+        tk.Button(btns3, text="Otimizar", command=self.fix_optimize,
+                 bg='#00BCD4', fg='white', font=('Arial', 11, 'bold'),
+                 padx=15, pady=5).pack(side='left', padx=5)
+        
+        tk.Button(btns3, text="Desfazer Otimização", command=self.fix_revert_optimize,
+                 bg='#607D8B', fg='white', font=('Arial', 11, 'bold'),
+                 padx=15, pady=5).pack(side='left', padx=5)
+        
         # Comando personalizado
         custom = ttk.LabelFrame(tab, text="Comando Personalizado", padding=20)
         custom.pack(fill='x', pady=10, padx=20)
@@ -286,6 +3473,60 @@ class GitAutomator:
                  bg='#9C27B0', fg='white', font=('Arial', 11, 'bold'),
                  padx=20, pady=5).pack(pady=10)
         
+    def setup_performance_tab(self, notebook):
+        """Aba desempenho: p50/p95/máximo por tipo de comando ou repositório"""
+        tab = ttk.Frame(notebook)
+        notebook.add(tab, text="Desempenho")
+        
+        controls = tk.Frame(tab)
+        controls.pack(fill='x', pady=10, padx=10)
+        ttk.Label(controls, text="Agrupar por:").pack(side='left')
+        self.perf_group_var = tk.StringVar(value='kind')
+        ttk.Radiobutton(controls, text="Tipo de comando", variable=self.perf_group_var, value='kind',
+                       command=self.refresh_performance).pack(side='left', padx=5)
+        ttk.Radiobutton(controls, text="Repositório", variable=self.perf_group_var, value='repo',
+                       command=self.refresh_performance).pack(side='left', padx=5)
+        ttk.Radiobutton(controls, text="Backend", variable=self.perf_group_var, value='backend',
+                       command=self.refresh_performance).pack(side='left', padx=5)
+        ttk.Label(controls, text="Período:").pack(side='left', padx=(15, 0))
+        self.perf_period_var = tk.StringVar(value='Tudo')
+        period = ttk.Combobox(controls, textvariable=self.perf_period_var, values=list(HISTORY_PERIODS),
+                              state='readonly', width=10)
+        period.pack(side='left', padx=5)
+        period.bind('<<ComboboxSelected>>', lambda e: self.refresh_performance())
+        ttk.Button(controls, text="Atualizar", command=self.refresh_performance).pack(side='left', padx=10)
+        
+        self.perf_tree = ttk.Treeview(tab, columns=('group', 'count', 'p50', 'p95', 'max', 'failures'),
+                                      show='headings', height=12)
+        for col, title, width in [('group', 'Grupo', 300), ('count', 'Execuções', 80), ('p50', 'p50', 80),
+                                  ('p95', 'p95', 80), ('max', 'Máximo', 80), ('failures', 'Erros', 60)]:
+            self.perf_tree.heading(col, text=title)
+            self.perf_tree.column(col, width=width, anchor='w')
+        self.perf_tree.pack(fill='both', expand=True, padx=10)
+        self.perf_summary_var = tk.StringVar(value=f"Histórico em {HISTORY_FILE}")
+        ttk.Label(tab, textvariable=self.perf_summary_var).pack(anchor='w', padx=10, pady=5)
+        self.refresh_performance()
+        
+    def refresh_performance(self):
+        """Recalcula a tabela de desempenho a partir do histórico (lido fora da thread da interface)"""
+        group = self.perf_group_var.get()
+        window = HISTORY_PERIODS.get(self.perf_period_var.get())
+        since = time.time() - window if window else None
+        
+        def show(records, report):
+            self.perf_tree.delete(*self.perf_tree.get_children())
+            for key, count, p50, p95, longest, failures in report:
+                self.perf_tree.insert('', 'end', values=(key, count, f"{p50:.2f}s", f"{p95:.2f}s",
+                                                         f"{longest:.2f}s", failures))
+            total = sum(record['seconds'] for record in records)
+            self.perf_summary_var.set(f"{len(records)} comando(s), {total:.1f}s no total - histórico em {HISTORY_FILE}")
+            
+        def run():
+            records = load_history(since)
+            self.run_in_ui(show, records, latency_report(records, group))
+            
+        threading.Thread(target=run, daemon=True).start()
+        
     def setup_config_tab(self, notebook):
         """Aba configurações"""
         tab = ttk.Frame(notebook)
@@ -307,6 +3548,12 @@ class GitAutomator:
                  bg='#FF9800', fg='white', font=('Arial', 11, 'bold'),
                  padx=15, pady=5).grid(row=2, column=0, columnspan=2, pady=10)
         
+        # Log em arquivo
+        log_frame = ttk.LabelFrame(tab, text="Log", padding=10)
+        log_frame.pack(fill='x', pady=5, padx=20)
+        ttk.Checkbutton(log_frame, text=f"Salvar histórico completo em {LOG_FILE} (rotativo)",
+                       variable=self.log_to_file_var, command=self.toggle_log_file).pack(anchor='w')
+        
         # Instruções
         inst_frame = ttk.LabelFrame(tab, text="CORREÇÕES IMPLEMENTADAS v3.2", padding=10)
         inst_frame.pack(fill='both', expand=True, pady=10, padx=20)
@@ -351,6 +3598,27 @@ AGORA FUNCIONA 100% GARANTIDO!"""
         inst_text.insert('1.0', instructions)
         inst_text.config(state='disabled')
         
+    def setup_queue_section(self, parent):
+        """Painel da fila de jobs"""
+        queue_frame = ttk.LabelFrame(parent, text="Fila de Jobs", padding=5)
+        queue_frame.pack(fill='x', pady=5)
+        
+        controls = tk.Frame(queue_frame)
+        controls.pack(fill='x')
+        ttk.Label(controls, text="Prioridade dos próximos:").pack(side='left')
+        self.priority_var = tk.StringVar(value='Normal')
+        ttk.Combobox(controls, textvariable=self.priority_var, values=list(JOB_PRIORITIES),
+                     state='readonly', width=8).pack(side='left', padx=5)
+        ttk.Button(controls, text="Cancelar selecionado", command=self.cancel_selected_job).pack(side='left', padx=10)
+        
+        self.queue_tree = ttk.Treeview(queue_frame, columns=('id', 'title', 'priority', 'state', 'time'),
+                                       show='headings', height=4)
+        for col, title, width in [('id', 'Job', 50), ('title', 'Repositório: comandos', 380),
+                                  ('priority', 'Prioridade', 80), ('state', 'Estado', 100), ('time', 'Tempo', 70)]:
+            self.queue_tree.heading(col, text=title)
+            self.queue_tree.column(col, width=width, anchor='w')
+        self.queue_tree.pack(fill='x', pady=2)
+        
     def setup_log_section(self, parent):
         """Seção de log"""
         log_frame = ttk.LabelFrame(parent, text="Log de Execução", padding=5)
@@ -360,15 +3628,79 @@ AGORA FUNCIONA 100% GARANTIDO!"""
                                                  font=('Consolas', 9))
         self.log_text.pack(fill='both', expand=True)
         
+        # Progresso de push/fetch (fases do --progress do git)
+        transfer_frame = tk.Frame(log_frame)
+        transfer_frame.pack(fill='x', pady=2)
+        self.transfer_bar = ttk.Progressbar(transfer_frame, maximum=100, length=250)
+        self.transfer_bar.pack(side='left')
+        self.transfer_var = tk.StringVar(value="")
+        tk.Label(transfer_frame, textvariable=self.transfer_var, font=('Arial', 9)).pack(side='left', padx=10)
+        
         self.log("Git Automatizador v3.2 - PROBLEMAS CORRIGIDOS!")
         self.log("✅ Remote origin, SSH/HTTPS e push corrigidos!")
+        self.root.after(LOG_DRAIN_MS, self.drain_log_queue)
         
     def log(self, msg):
-        """Adiciona mensagem ao log"""
-        timestamp = time.strftime("[%H:%M:%S]")
-        self.log_text.insert('end', f"{timestamp} {msg}\n")
-        self.log_text.see('end')
-        self.root.update()
+        """Adiciona mensagem ao log (thread-safe: só enfileira)"""
+        line = f"{time.strftime('[%H:%M:%S]')} {msg}"
+        self.log_queue.put(line)
+        if self.file_logger:
+            self.file_logger.info(line)
+            
+    def drain_log_queue(self):
+        """Escreve no widget, em lote, as mensagens pendentes (roda na thread da UI)"""
+        batch = deque(maxlen=LOG_MAX_LINES)
+        dropped = 0
+        try:
+            while True:
+                if len(batch) == LOG_MAX_LINES:
+                    dropped += 1
+                batch.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+            
+        if batch:
+            lines = list(batch)
+            if dropped:
+                lines.insert(0, f"... {dropped} linhas omitidas na tela")
+            self.log_text.insert('end', '\n'.join(lines) + '\n')
+            # Manter só as últimas LOG_MAX_LINES linhas na tela (contadas no widget: mensagens do git
+            # trazem várias linhas)
+            total = int(self.log_text.index('end-1c').split('.')[0])
+            if total > LOG_MAX_LINES:
+                self.log_text.delete('1.0', f'{total - LOG_MAX_LINES + 1}.0')
+            self.log_text.see('end')
+            
+        # Atualizações de widgets vindas das threads de trabalho
+        try:
+            while True:
+                func, args = self.ui_calls.get_nowait()
+                func(*args)
+        except queue.Empty:
+            pass
+            
+        self.root.after(LOG_DRAIN_MS, self.drain_log_queue)
+        
+    def run_in_ui(self, func, *args):
+        """Agenda func(*args) na thread da UI (widgets tkinter não são thread-safe)"""
+        self.ui_calls.put((func, args))
+        
+    def toggle_log_file(self):
+        """Liga/desliga o histórico completo em arquivo rotativo"""
+        if self.log_to_file_var.get() and not self.file_logger:
+            ensure_gitpilot_home()
+            handler = logging.handlers.RotatingFileHandler(
+                LOG_FILE, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            self.file_logger = logging.getLogger('gitpilot')
+            self.file_logger.setLevel(logging.INFO)
+            self.file_logger.propagate = False
+            self.file_logger.addHandler(handler)
+        elif not self.log_to_file_var.get() and self.file_logger:
+            for handler in list(self.file_logger.handlers):
+                self.file_logger.removeHandler(handler)
+                handler.close()
+            self.file_logger = None
         
     def select_folder(self):
         """Seleciona pasta"""
@@ -376,6 +3708,7 @@ AGORA FUNCIONA 100% GARANTIDO!"""
         if folder:
             self.folder_var.set(folder)
             self.log(f"Pasta selecionada: {folder}")
+            self.apply_profile()
             
     def validate_url(self):
         """Valida e corrige formato da URL"""
@@ -404,12 +3737,12 @@ AGORA FUNCIONA 100% GARANTIDO!"""
         self.log(f"URL validada: {url}")
         messagebox.showinfo("URL Validada", f"URL formatada para HTTPS:\n{url}")
         
-    def type_command_clipboard(self, command):
+    def type_command_clipboard(self, job, command, timeout=None, on_step=None):
         """Digita comando usando clipboard (mais confiável)"""
-        if not self.is_running:
+        if job.cancelled:
             return
             
-        self.log(f"Executando: {command}")
+        job.log(f"Executando: {command}")
         
         # Limpar linha atual
         pyautogui.hotkey('ctrl', 'a')
@@ -417,8 +3750,9 @@ AGORA FUNCIONA 100% GARANTIDO!"""
         pyautogui.press('delete')
         time.sleep(0.2)
         
-        # Copiar comando para clipboard
-        pyperclip.copy(command)
+        # Copiar comando (com marcador de término) para clipboard
+        typed, token = self.add_completion_marker(command)
+        pyperclip.copy(typed)
         time.sleep(0.1)
         
         # Colar comando
@@ -428,16 +3762,15 @@ AGORA FUNCIONA 100% GARANTIDO!"""
         # Enter
         pyautogui.press('enter')
         
-        # Aguardar execução (tempo aumentado)
-        self.log(f"Aguardando {self.delay_between_commands}s...")
-        time.sleep(self.delay_between_commands)
+        # Aguardar execução
+        return self.wait_command(job, command, token, timeout, on_step)
         
-    def type_command_direct(self, command):
+    def type_command_direct(self, job, command, timeout=None, on_step=None):
         """Digita comando caractere por caractere"""
-        if not self.is_running:
+        if job.cancelled:
             return
             
-        self.log(f"Executando: {command}")
+        job.log(f"Executando: {command}")
         
         # Limpar linha
         pyautogui.hotkey('ctrl', 'a')
@@ -446,91 +3779,403 @@ AGORA FUNCIONA 100% GARANTIDO!"""
         time.sleep(0.2)
         
         # Digitar comando
-        pyautogui.typewrite(command, interval=0.02)
+        typed, token = self.add_completion_marker(command)
+        pyautogui.typewrite(typed, interval=TYPING_INTERVAL)
         time.sleep(0.2)
         
         # Enter
         pyautogui.press('enter')
         
         # Aguardar execução
-        self.log(f"Aguardando {self.delay_between_commands}s...")
-        time.sleep(self.delay_between_commands)
+        return self.wait_command(job, command, token, timeout, on_step)
+        
+    def add_completion_marker(self, command):
+        """Anexa ao comando um echo que grava token e código de saída no arquivo de marcadores"""
+        if not self.marker_file:
+            return command, None
+        token = uuid.uuid4().hex[:12]
+        marker_path = self.marker_file.replace('\\', '/')
+        return f'{command}; echo "GITPILOT_DONE {token} $?" >> "{marker_path}"', token
+        
+    def wait_command(self, job, command, token, timeout=None, on_step=None):
+        """Aguarda o marcador de término do comando (ou o delay fixo se desativado)"""
+        if token is None:
+            # Delay extra para comandos importantes (remote add, push, commit)
+            delay = fixed_command_wait(command, self.delay_between_commands)
+            job.log(f"Aguardando {delay}s...")
+            job.cancel_event.wait(delay)
+            return None
+            
+        timeout = timeout or command_timeout(command)
+        pattern = re.compile(rf'^GITPILOT_DONE {token} (\d+)\s*$', re.M)
+        step_pattern = re.compile(r'^GITPILOT_STEP (\d+) (\d+)\s*$', re.M)
+        steps_seen = 0
+        job.log(f"Aguardando término (até {timeout}s)...")
+        start = time.time()
+        while not job.cancelled and time.time() - start < timeout:
+            try:
+                with open(self.marker_file, 'r', encoding='utf-8', errors='replace') as f:
+                    f.seek(self.marker_offset)
+                    data = f.read()
+            except OSError:
+                data = ''
+            # Progresso por passo (script único)
+            if on_step:
+                steps = step_pattern.findall(data)
+                for index, code in steps[steps_seen:]:
+                    on_step(int(index), int(code))
+                steps_seen = len(steps)
+            match = pattern.search(data)
+            if match:
+                self.marker_offset += len(data.encode('utf-8'))
+                code = int(match.group(1))
+                elapsed = time.time() - start
+                if code == 0:
+                    job.log(f"✓ Código 0 ({elapsed:.2f}s)")
+                else:
+                    job.log(f"❌ Código {code} ({elapsed:.2f}s)")
+                return code
+            job.cancel_event.wait(0.1)
+            
+        if job.cancelled:
+            # O processo roda no Git Bash, fora do nosso alcance: interromper pelo terminal
+            pyautogui.hotkey('ctrl', 'c')
+            job.log("⏹️ Ctrl+C enviado ao Git Bash")
+        else:
+            job.log(f"⚠️ Sem sinal de término após {timeout}s - seguindo")
+        return None
+        
+    def run_command_subprocess(self, job, command):
+        """Executa comando direto via subprocess na pasta do projeto"""
+        if job.cancelled:
+            return 0
+        
+        job.log(f"Executando: {command}")
+        
+        # 'cd' não sobrevive entre processos: guardar a pasta para os próximos comandos
+        target = resolve_cd(command, job.work_dir)
+        if target:
+            job.work_dir = target
+            job.log(f"📂 Pasta de trabalho: {target}")
+            return 0
+        if job.parallel_stage and command.strip() == 'git add .':
+            return self.run_parallel_stage(job)
+        
+        start = time.time()
+        metrics = None
+        locks = git_lock_files(job.work_dir)
+        try:
+            if is_transfer_command(command):
+                result, metrics = run_transfer(command, job.work_dir,
+                                               on_progress=lambda phase, percent: self.run_in_ui(
+                                                   self.show_transfer_progress, phase, percent),
+                                               cancel_event=job.cancel_event)
+            else:
+                result = run_shell(command, job.work_dir, cancel_event=job.cancel_event)
+        except CommandCancelled:
+            job.log(f"⏹️ Processo encerrado em {time.time() - start:.2f}s")
+            removed = remove_stale_locks(job.work_dir, start, locks)
+            if removed:
+                job.log(f"🧹 Travas removidas: {', '.join(removed)}")
+            return None
+        elapsed = time.time() - start
+        
+        for line in result.stdout.splitlines():
+            job.log(f"   {line}")
+        for line in result.stderr.splitlines():
+            job.log(f"   ! {line}")
+        
+        if result.returncode == 0:
+            job.log(f"✓ Código 0 ({elapsed:.2f}s)")
+        else:
+            job.log(f"❌ Código {result.returncode} ({elapsed:.2f}s)")
+        if metrics:
+            self.report_transfer(job, command, result.returncode, metrics)
+        return result.returncode
         
-    def type_command(self, command):
+    def run_parallel_stage(self, job):
+        """'git add .' em lotes paralelos com arquivos/s e bytes/s na barra de progresso"""
+        start = time.time()
+        last_log = [0.0]
+        
+        def progress(files, total, done_bytes, total_bytes, seconds):
+            percent = int(100 * done_bytes / total_bytes) if total_bytes else 100
+            rate = f"{files / max(seconds, 1e-6):.0f} arquivos/s, {format_size(done_bytes / max(seconds, 1e-6))}/s"
+            self.run_in_ui(self.show_transfer_progress, f"Staging {files}/{total} ({rate})", percent)
+            if time.time() - last_log[0] >= 1 or files == total:
+                last_log[0] = time.time()
+                job.log(f"   {files}/{total} arquivos, {format_size(done_bytes)}/{format_size(total_bytes)} - {rate}")
+        
+        locks = git_lock_files(job.work_dir)
+        try:
+            summary = stage_parallel(job.work_dir, on_progress=progress, cancel_event=job.cancel_event)
+        except CommandCancelled:
+            job.log(f"⏹️ Staging interrompido em {time.time() - start:.2f}s (os lotes prontos ficam salvos)")
+            removed = remove_stale_locks(job.work_dir, start, locks)
+            if removed:
+                job.log(f"🧹 Travas removidas: {', '.join(removed)}")
+            return None
+        except (OSError, RuntimeError) as e:
+            job.log(f"❌ Staging em lotes: {e}")
+            return 1
+        elapsed = time.time() - start
+        job.log(f"✓ {summary['files']} arquivos ({format_size(summary['bytes'])}) em {elapsed:.2f}s"
+                + (f", {summary['resumed']} retomados" if summary['resumed'] else "")
+                + (f", {summary['removed']} removidos" if summary['removed'] else ""))
+        return 0
+        
+    def show_transfer_progress(self, phase, percent):
+        """Atualiza a barra de progresso do push/fetch (thread da interface)"""
+        self.transfer_bar['value'] = percent
+        self.transfer_var.set(f"{phase}: {percent}%")
+        
+    def report_transfer(self, job, command, returncode, metrics):
+        """Registra as métricas do push/fetch e compara com as execuções anteriores do repositório"""
+        baseline = transfer_baseline(job.work_dir)
+        save_transfer_metrics(job.work_dir, command, returncode, metrics)
+        job.log(f"📊 {format_transfer_metrics(metrics)}")
+        if returncode == 0 and baseline and metrics['seconds'] > baseline * 1.5 and metrics['seconds'] > 1:
+            job.log(f"🐢 {metrics['seconds'] / baseline:.1f}x mais lento que a média recente ({baseline:.1f}s)")
+        self.run_in_ui(self.transfer_var.set, f"Última transferência: {metrics['seconds']:.1f}s, "
+                                              f"{format_size(metrics['throughput_bps'])}/s")
+    
+    def run_single_paste(self, job, commands):
+        """Compila a lista em um script, cola uma única vez e acompanha cada passo"""
+        marker_path = self.marker_file.replace('\\', '/')
+        fd, script_file = tempfile.mkstemp(prefix='gitpilot_', suffix='.sh')
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(compile_script(commands, marker_path))
+        script_path = script_file.replace('\\', '/')
+        total = len(commands)
+        failures = []
+        step_start = [time.time()]
+        
+        def on_step(index, code):
+            cmd = commands[index - 1] if 0 < index <= total else '?'
+            now = time.time()
+            record_command(cmd, now - step_start[0], code, job.work_dir, 'pyautogui')
+            step_start[0] = now
+            if code == 0:
+                job.log(f"✓ [{index}/{total}] {cmd}")
+            else:
+                failures.append(index)
+                job.log(f"❌ [{index}/{total}] {cmd} (código {code})")
+                
+        try:
+            job.log(f"📋 Script único com {total} passos: {script_file}")
+            timeout = sum(command_timeout(cmd) for cmd in commands)
+            # 'source' mantém os 'cd' do script no terminal, como nos comandos avulsos
+            self.type_command(job, f'source "{script_path}"', timeout, on_step)
+        finally:
+            try:
+                os.remove(script_file)
+            except OSError:
+                pass
+        return len(failures)
+        
+    def type_command(self, job, command, timeout=None, on_step=None):
         """Escolhe método de digitação baseado na configuração"""
-        if self.use_clipboard_method.get():
-            self.type_command_clipboard(command)
+        if job.backend == 'subprocess':
+            return self.run_command_subprocess(job, command)
+        if job.use_clipboard:
+            return self.type_command_clipboard(job, command, timeout, on_step)
+        return self.type_command_direct(job, command, timeout, on_step)
+    
+    def run_async_job(self, job, commands, success_msg, on_success, folder):
+        """Executa o job no motor asyncio (saída ao vivo) e espera o fim; cancelar o job mata os processos"""
+        with self.engine_lock:
+            if self.async_engine is None:
+                self.async_engine = AsyncJobEngine()
+        done = threading.Event()
+        outcome = {}
+        
+        def on_done(engine_id, result):
+            outcome['result'] = result
+            done.set()
+            
+        def on_command(cmd, cwd, code, seconds):
+            record_command(cmd, seconds, code, cwd, 'asyncio')
+            
+        job.log("=" * 50)
+        job.log(f"Executando com asyncio ({len(commands)} comandos)...")
+        def on_progress(phase, percent):
+            self.run_in_ui(self.show_transfer_progress, phase, percent)
+            
+        def on_transfer(cmd, cwd, code, metrics):
+            self.report_transfer(job, cmd, code, metrics)
+            
+        engine_id = self.async_engine.submit(commands, folder, lambda _, text: job.log(text), on_done, on_command,
+                                             on_progress, on_transfer)
+        while not done.wait(0.05):
+            if job.cancelled:
+                self.async_engine.cancel(engine_id)
+                done.wait()
+        result = outcome['result']
+        if result is None:
+            job.log("⏹️ Cancelado")
+            return False
+        job.log("=" * 50)
+        failures = result['failures']
+        elapsed = result['elapsed']
+        if not failures and on_success:
+            # Pushes que saem depois dos comandos (espelhos) contam como falhas do job
+            push_start = time.time()
+            failures += on_success(job) or 0
+            elapsed += time.time() - push_start
+        if failures:
+            job.detail = result.get('error', '')
+            job.log(f"⚠️ Concluído com {failures} comando(s) com erro - veja o log acima")
         else:
-            self.type_command_direct(command)
+            job.log(f"✅ {success_msg}")
+        job.log(f"⏱️ Tempo total: {elapsed:.2f}s")
+        self.remember_result(folder, success_msg, not failures, elapsed)
+        return not failures
+        
+
+    def execute_commands(self, commands, success_msg="Concluído!", on_success=None, needs_folder=True):
+        """Enfileira a lista de comandos (on_success(job) só é chamado quando há códigos de saída reais
+        e pode retornar um número de falhas a somar às do job)"""
+        # Sem Git Bash os comandos rodam na pasta do projeto: sem ela, rodariam na pasta do programa
+        folder = self.folder_var.get().strip()
+        if needs_folder and self.backend_var.get() != 'pyautogui' and not (folder and os.path.isdir(folder)):
+            messagebox.showerror("Erro", "Selecione uma pasta de projeto existente na aba Novo Projeto!")
+            return
             
-    def execute_commands(self, commands, success_msg="Concluído!"):
-        """Executa lista de comandos"""
-        if self.is_running:
-            self.log("Já está em execução!")
+        git_bash = self.backend_var.get() == 'pyautogui'
+        if git_bash and not load_gui_automation():
+            messagebox.showerror("Erro", "Modo Git Bash precisa de pyautogui e pyperclip.\n"
+                                 "Execute: pip install pyautogui pyperclip\n"
+                                 "ou use a execução Direta (subprocess).")
             return
             
-        self.is_running = True
-        self.start_btn.config(state='disabled')
-        self.stop_btn.config(state='normal')
+        folder = folder or None
+        # Git Bash é um terminal e um teclado só: os jobs dele nunca rodam em paralelo
+        key = 'git-bash' if git_bash else os.path.normcase(os.path.abspath(folder or '.'))
+        kinds = [command_kind(cmd) for cmd in (getattr(step, 'command', step) for step in commands)
+                 if not cmd.strip().startswith('cd ')]
+        title = f"{os.path.basename(os.path.abspath(folder or '.'))}: {', '.join(kinds) or '-'}"
+        waiting = self.job_queue.busy(key)
         
-        def run():
-            try:
-                self.log("=" * 50)
-                self.log("Iniciando em 5 segundos...")
-                self.log("⚠️ CLIQUE NO GIT BASH AGORA!")
-                self.log("=" * 50)
-                
-                # Contagem regressiva
+        settings = {'backend': self.backend_var.get(), 'use_clipboard': self.use_clipboard_method.get(),
+                    'wait_marker': self.wait_marker_var.get(), 'single_paste': self.single_paste_var.get(),
+                    'parallel_stage': self.parallel_stage_var.get()}
+        job = self.job_queue.submit(
+            key, title, lambda job: self.run_job(job, commands, success_msg, on_success, folder, settings),
+            JOB_PRIORITIES.get(self.priority_var.get(), JOB_PRIORITIES['Normal']), log=self.log)
+        self.log(f"📥 J{job.id} na fila: {title}" + (" (aguardando outro job do mesmo repositório)" if waiting else ""))
+        
+    def run_job(self, job, commands, success_msg, on_success, folder, settings):
+        """Executa um job da fila (thread do agendador); retorna True se todos os comandos deram certo"""
+        job.backend = settings['backend']
+        job.use_clipboard = settings['use_clipboard']
+        job.parallel_stage = settings['parallel_stage']
+        # Plano: conferido agora, na hora de rodar (outro job da fila pode ter mudado o repositório)
+        if any(isinstance(cmd, PlanStep) for cmd in commands):
+            commands, skipped = resolve_plan(commands, probe_repo_state(folder))
+            for command, reason in skipped:
+                job.log(f"⏭️ Pulando '{command}': {reason}")
+        if job.backend == 'asyncio':
+            return self.run_async_job(job, commands, success_msg, on_success, folder)
+        use_subprocess = job.backend == 'subprocess'
+        single_paste = not use_subprocess and settings['single_paste']
+        # Sem 'cd' na lista, o backend subprocess usa a pasta do projeto
+        job.work_dir = folder
+        
+        # Arquivo de marcadores para saber quando cada comando digitado termina
+        if not use_subprocess and (settings['wait_marker'] or single_paste):
+            fd, self.marker_file = tempfile.mkstemp(prefix='gitpilot_', suffix='.done')
+            os.close(fd)
+            self.marker_offset = 0
+            
+        try:
+            job.log("=" * 50)
+            if use_subprocess:
+                job.log("Executando direto (subprocess)...")
+            else:
+                job.log("Iniciando em 5 segundos...")
+                job.log("⚠️ CLIQUE NO GIT BASH AGORA!")
+            job.log("=" * 50)
+            
+            # Contagem regressiva
+            if not use_subprocess:
                 for i in range(5, 0, -1):
-                    if not self.is_running:
-                        return
-                    self.log(f"⏰ {i}...")
-                    time.sleep(1)
-                
-                # Executar comandos
-                total = len(commands)
+                    if job.cancelled:
+                        return False
+                    job.log(f"⏰ {i}...")
+                    job.cancel_event.wait(1)
+            
+            # Executar comandos
+            total = len(commands)
+            failures = 0
+            start = time.time()
+            if single_paste:
+                failures = self.run_single_paste(job, commands)
+            else:
                 for i, cmd in enumerate(commands, 1):
-                    if not self.is_running:
+                    if job.cancelled:
                         break
-                    self.log(f"[{i}/{total}] {cmd}")
-                    self.type_command(cmd)
-                    
-                    # Delay extra para comandos importantes
-                    if any(keyword in cmd for keyword in ['git remote add', 'git push', 'git commit']):
-                        time.sleep(1)  # Tempo extra
-                
-                if self.is_running:
-                    self.log("=" * 50)
-                    self.log(f"✅ {success_msg}")
-                    self.log("=" * 50)
-                    
-            except Exception as e:
-                self.log(f"❌ ERRO: {e}")
-            finally:
-                self.stop_automation()
+                    job.log(f"[{i}/{total}] {cmd}")
+                    cmd_start = time.time()
+                    code = self.type_command(job, cmd)
+                    record_command(cmd, time.time() - cmd_start, code, job.work_dir, job.backend,
+                                   cancelled=job.cancelled)
+                    if job.cancelled:
+                        job.detail = f"no passo {i}/{total}"
+                        job.log(f"⏹️ Cancelado no passo {i}/{total}: {cmd}")
+                        break
+                    if code:
+                        failures += 1
+            
+            if job.cancelled:
+                if not job.detail:
+                    job.detail = "antes do início" if not single_paste else "durante o script"
+                return False
+            job.log("=" * 50)
+            if not failures and use_subprocess and on_success:
+                # Pushes que saem depois dos comandos (espelhos) contam como falhas do job
+                failures += on_success(job) or 0
+            if failures:
+                job.log(f"⚠️ Concluído com {failures} comando(s) com erro - veja o log acima")
+            else:
+                job.log(f"✅ {success_msg}")
+            job.log(f"⏱️ Tempo total: {time.time() - start:.2f}s")
+            job.log("=" * 50)
+            self.remember_result(folder, success_msg, not failures, time.time() - start)
+            return not failures
+        finally:
+            if self.marker_file and not use_subprocess:
+                try:
+                    os.remove(self.marker_file)
+                except OSError:
+                    pass
+                self.marker_file = None
                 
-        # Thread separada
-        thread = threading.Thread(target=run, daemon=True)
-        thread.start()
-        
     def stop_automation(self):
-        """Para automação"""
-        self.is_running = False
-        self.start_btn.config(state='normal')
-        self.stop_btn.config(state='disabled')
-        self.log("⏹️ Parado")
+        """Para automação: cancela os jobs em andamento e os que estão na fila"""
+        cancelled = self.job_queue.cancel_all()
+        self.log(f"⏹️ Parado ({cancelled} job(s) cancelado(s))")
+        
+    def cancel_selected_job(self):
+        """Cancela os jobs selecionados no painel da fila"""
+        for item in self.queue_tree.selection():
+            if self.job_queue.cancel(int(item)):
+                self.log(f"⏹️ J{item} cancelado")
+                
+    def refresh_queue_panel(self):
+        """Redesenha o painel da fila (thread da interface)"""
+        self.queue_tree.delete(*self.queue_tree.get_children())
+        now = time.time()
+        for job in self.job_queue.snapshot():
+            elapsed = (job.ended or now) - (job.started or now)
+            self.queue_tree.insert('', 'end', iid=str(job.id), values=(
+                f"J{job.id}", job.title, JOB_PRIORITY_NAMES[job.priority],
+                f"{job.state} {job.detail}" if job.state in ('cancelado', 'falhou') and job.detail else job.state,
+                f"{elapsed:.1f}s" if job.started else "-"))
+        self.stop_btn.config(state='normal' if self.job_queue.busy() else 'disabled')
         
     def test_system(self):
         """Testa o sistema completo"""
-        commands = [
-            "echo '=== TESTE DO SISTEMA v3.2 ==='",
-            "pwd",
-            "git --version",
-            "git config --list | grep user",
-            "git status",
-            "echo 'Sistema funcionando perfeitamente!'"
-        ]
-        self.execute_commands(commands, "Teste do sistema concluído com sucesso!")
+        self.execute_commands(TEST_COMMANDS, "Teste do sistema concluído com sucesso!", needs_folder=False)
         
     def start_new_project(self):
         """Inicia novo projeto - VERSÃO CORRIGIDA"""
@@ -542,77 +4187,450 @@ AGORA FUNCIONA 100% GARANTIDO!"""
             messagebox.showerror("Erro", "Digite a URL do repositório!")
             return
             
-        # Formatar URL corretamente para HTTPS
-        if repo.startswith('git@github.com:'):
-            repo = repo.replace('git@github.com:', 'https://github.com/')
-            
-        if not repo.endswith('.git'):
-            repo = repo + '.git'
-        if not repo.startswith('http'):
-            repo = 'https://' + repo
+        repo = normalize_repo_url(repo)
             
         # Salvar config
-        self.config['last_folder'] = folder
-        self.config['last_repo'] = repo
+        if folder:
+            self.config.update_profile(folder, repo=repo, branch='main', backend=self.backend_var.get(),
+                                       delay_between_commands=self.delay_between_commands)
         self.save_config()
         
         # Log da URL que será usada
         self.log(f"📌 URL HTTPS configurada: {repo}")
         
-        # Comandos CORRIGIDOS
-        commands = []
+        if not self.preflight_var.get() or not folder or not os.path.isdir(folder):
+            self.publish_project(folder, repo, msg)
+            return
+            
+        limit = self.config.get('large_file_limit_mb', LARGE_FILE_LIMIT_MB) * 1024 * 1024
+        self.log("🛫 Pré-voo: verificando tudo em paralelo...")
         
-        # Navegar para pasta se especificada
-        if folder:
-            folder_path = folder.replace('\\', '/')
-            commands.append(f'cd "{folder_path}"')
-            
-        # Configurar para usar HTTPS em vez de SSH
-        commands.append('git config --local url."https://github.com/".insteadOf git@github.com:')
-        
-        # Limpeza automática se marcada
-        if self.clean_remote_var.get():
-            commands.append('git remote remove origin 2>/dev/null || true')
-            
-        # Inicializar se necessário
-        commands.append('git init')
-        
-        # Criar .gitignore se solicitado
-        if self.gitignore_var.get():
-            commands.extend([
-                'echo "node_modules/" > .gitignore',
-                'echo "*.log" >> .gitignore',
-                'echo ".env" >> .gitignore',
-                'echo "__pycache__/" >> .gitignore',
-                'echo "venv/" >> .gitignore'
-            ])
-            
-        # Verificar se há mudanças e adicionar
-        commands.extend([
-            'git add .',
-            f'git commit -m "{msg}" || echo "Nada para commitar"'
-        ])
+        def run():
+            start = time.time()
+            report = run_preflight(folder, repo, limit)
+            self.run_in_ui(self.finish_preflight, report, time.time() - start, folder, repo, msg)
+            
+        threading.Thread(target=run, daemon=True).start()
         
-        # Configurar remote e fazer push
-        commands.extend([
-            f'git remote add origin {repo}',
-            'git branch -M main',
-            f'git push --set-upstream origin main{" --force" if self.force_var.get() else ""}'
-        ])
+    def finish_preflight(self, report, elapsed, folder, repo, msg):
+        """Mostra o relatório do pré-voo e segue para a publicação (confirmando se houver erros)"""
+        for line in format_preflight(report).splitlines():
+            self.log(f"   {line}")
+        errors = [item for item in report if item['status'] == 'erro']
+        self.log(f"🛫 Pré-voo em {elapsed:.2f}s: {len(errors)} erro(s), "
+                 f"{sum(item['status'] == 'aviso' for item in report)} aviso(s)")
+        if errors and not messagebox.askyesno(
+                "Pré-voo", "Problemas encontrados:\n\n"
+                + '\n'.join(f"• {item['check']}: {item['detail']}" for item in errors)
+                + "\n\nPublicar mesmo assim?"):
+            self.log("⏹️ Publicação cancelada pelo pré-voo")
+            return
+        self.publish_project(folder, repo, msg)
+        
+    def publish_project(self, folder, repo, msg):
+        """Monta o plano do Novo Projeto (pulando o que já está feito) e coloca na fila"""
+        local = bool(folder) and os.path.isdir(folder)
+        # Sem acesso à pasta daqui, o .gitignore é o básico, escrito pelos próprios comandos
+        basic_gitignore = self.gitignore_var.get() and not local
+        
+        def queue_plan(before_add):
+            plan = build_publish_plan(repo, msg, folder, clean_remote=self.clean_remote_var.get(),
+                                      force=self.force_var.get(), basic_gitignore=basic_gitignore,
+                                      before_add=before_add)
+            # O plano vai inteiro para a fila: os passos já satisfeitos são pulados quando o job roda
+            commands, on_success = self.with_mirrors(plan, folder, upstream=True, force=self.force_var.get())
+            self.execute_commands(commands, "🎉 PROJETO PUBLICADO NO GITHUB COM SUCESSO!", on_success)
+            
+        def check_sizes(_=None):
+            # Arquivos grandes: resolver antes do commit (push gigante que falha no fim)
+            if local:
+                self.check_large_files(folder, queue_plan)
+            else:
+                queue_plan([])
+                
+        def write_proposal():
+            start = time.perf_counter()
+            try:
+                proposal = propose_gitignore(folder)
+                new_rules = write_gitignore(folder, proposal)
+            except OSError as e:
+                self.log(f"⚠️ .gitignore não gerado: {e}")
+                return
+            self.log(f"📝 .gitignore: {len(new_rules)} regra(s) nova(s), "
+                     f"{proposal['excluded_files']} arquivos / {format_size(proposal['excluded_bytes'])} "
+                     f"fora do commit ({(time.perf_counter() - start) * 1000:.0f} ms)")
+            
+        # .gitignore sob medida primeiro (a varredura roda fora da thread da interface)
+        if self.gitignore_var.get() and local:
+            self.log("📝 Analisando a pasta para o .gitignore...")
+            self.run_in_background(write_proposal, check_sizes)
+        else:
+            check_sizes()
+        
+    def run_in_background(self, work, then):
+        """Roda work() em uma thread e entrega o resultado a then() na thread da interface"""
+        threading.Thread(target=lambda: self.run_in_ui(then, work()), daemon=True).start()
+        
+    def check_large_files(self, folder, then):
+        """Pré-voo dos tamanhos (varredura fora da thread da interface): chama then(comandos extras
+        de LFS/.gitignore), ou não chama se o usuário desistir"""
+        if not self.large_check_var.get():
+            then([])
+            return
+        warn = self.config.get('large_file_warn_mb', LARGE_FILE_WARN_MB) * 1024 * 1024
+        limit = self.config.get('large_file_limit_mb', LARGE_FILE_LIMIT_MB) * 1024 * 1024
+        
+        def scan():
+            start = time.perf_counter()
+            try:
+                return find_large_files(folder, warn), (time.perf_counter() - start) * 1000
+            except (OSError, RuntimeError) as e:
+                self.log(f"⚠️ Verificação de arquivos grandes indisponível: {e}")
+                return [], None
+                
+        def done(result):
+            commands = self.resolve_large_files(folder, result[0], result[1], limit)
+            if commands is not None:
+                then(commands)
+                
+        self.log("📏 Verificando arquivos grandes...")
+        self.run_in_background(scan, done)
+        
+    def resolve_large_files(self, folder, large, elapsed, limit):
+        """Pergunta o que fazer com os arquivos acima do limite: comandos extras ou None para abortar"""
+        too_big = [(rel, size) for rel, size in large if size >= limit]
+        for rel, size in large:
+            if size < limit:
+                self.log(f"⚠️ Arquivo grande (aceito): {rel} ({format_size(size)})")
+        if not too_big:
+            if elapsed is not None:
+                self.log(f"📏 Nenhum arquivo acima do limite ({elapsed:.0f} ms)")
+            return []
+            
+        listing = '\n'.join(f"• {rel} ({format_size(size)})" for rel, size in too_big[:15])
+        if len(too_big) > 15:
+            listing += f"\n... e mais {len(too_big) - 15}"
+        answer = messagebox.askyesnocancel(
+            "Arquivos grandes",
+            f"{len(too_big)} arquivo(s) acima de {format_size(limit)} - o push seria recusado:\n\n{listing}\n\n"
+            "SIM: enviar pelo Git LFS\nNÃO: colocar no .gitignore\nCANCELAR: não publicar")
+        if answer is None:
+            self.log("⏹️ Publicação cancelada (arquivos grandes)")
+            return None
+            
+        paths = [rel for rel, _ in too_big]
+        if answer:
+            if not git_lfs_available(folder):
+                messagebox.showerror("Erro", "Git LFS não encontrado. Instale em https://git-lfs.com")
+                return None
+            self.log(f"📦 {len(paths)} arquivo(s) irão pelo Git LFS")
+            return large_file_commands(folder, paths, 'lfs')
+            
+        commands = large_file_commands(folder, paths, 'gitignore')
+        self.log(f"📝 {len(paths)} arquivo(s) grande(s) no .gitignore")
+        return commands
+        
+    def preview_plan(self):
+        """Prévia (dry-run) do Novo Projeto: mostra o que roda e o que já está feito"""
+        folder = self.folder_var.get().strip()
+        repo = self.repo_var.get().strip()
+        if not repo:
+            messagebox.showerror("Erro", "Digite a URL do repositório!")
+            return
+        msg = self.commit_var.get().strip() or "Primeiro commit"
+        plan = build_publish_plan(normalize_repo_url(repo), msg, folder,
+                                  clean_remote=self.clean_remote_var.get(), force=self.force_var.get(),
+                                  basic_gitignore=self.gitignore_var.get() and not os.path.isdir(folder))
+        
+        window = tk.Toplevel(self.root)
+        window.title("Prévia do plano")
+        window.geometry("700x350")
+        text = scrolledtext.ScrolledText(window, font=('Consolas', 9))
+        text.pack(fill='both', expand=True)
+        text.insert('1.0', format_plan(plan, probe_repo_state(folder)))
+        text.config(state='disabled')
+        
+    def preview_gitignore(self):
+        """Mostra as regras sugeridas e quanto cada uma tira do commit"""
+        folder = self.folder_var.get().strip()
+        if not folder or not os.path.isdir(folder):
+            messagebox.showerror("Erro", "Selecione uma pasta de projeto válida!")
+            return
+        self.log(f"🔎 Analisando {folder}...")
         
-        self.execute_commands(commands, "🎉 PROJETO PUBLICADO NO GITHUB COM SUCESSO!")
+        def show(proposal):
+            window = tk.Toplevel(self.root)
+            window.title("Sugestão de .gitignore")
+            window.geometry("700x400")
+            text = scrolledtext.ScrolledText(window, font=('Consolas', 9))
+            text.pack(fill='both', expand=True)
+            text.insert('1.0', format_gitignore_proposal(proposal))
+            
+            def apply():
+                new_rules = write_gitignore(folder, proposal)
+                self.log(f"📝 .gitignore atualizado: {len(new_rules)} regra(s) nova(s)")
+                window.destroy()
+                
+            tk.Button(window, text="APLICAR NO .gitignore", command=apply,
+                     bg='#4CAF50', fg='white', font=('Arial', 11, 'bold')).pack(pady=5)
+            
+        def run():
+            try:
+                proposal = propose_gitignore(folder)
+                self.run_in_ui(show, proposal)
+            except OSError as e:
+                self.log(f"❌ ERRO: {e}")
+                
+        threading.Thread(target=run, daemon=True).start()
         
     def start_update(self):
         """Atualiza projeto"""
         msg = self.update_msg_var.get().strip() or "Atualização"
         
-        commands = [
-            'git add .',
-            f'git commit -m "{msg}" || echo "Nada para commitar"',
-            'git push || git push --set-upstream origin main'
-        ]
+        commands = build_update_commands(msg)
+        
+        folder = self.folder_var.get().strip()
+        
+        def queue_update(commands, on_success=None):
+            def queue(large_commands):
+                queued, done = self.with_mirrors(large_commands + commands, folder, on_success)
+                self.execute_commands(queued, "✅ PROJETO ATUALIZADO!", done)
+                
+            if folder and os.path.isdir(folder) and commands[0] == 'git add .':
+                self.check_large_files(folder, queue)
+            else:
+                queue([])
+                
+        if not (self.skip_noop_var.get() and folder):
+            queue_update(commands)
+            return
+            
+        # Atalho: sem mudanças na árvore e nada a enviar, não roda nada (varredura fora da thread da interface)
+        def check():
+            try:
+                start = time.perf_counter()
+                changed, snapshot = working_tree_changed(folder)
+                ahead = branch_ahead(folder)
+                return changed, snapshot, ahead, (time.perf_counter() - start) * 1000
+            except (OSError, RuntimeError) as e:
+                self.log(f"⚠️ Verificação de mudanças indisponível: {e}")
+                return None
+                
+        def decide(result):
+            if result is None:
+                queue_update(commands)
+                return
+            changed, snapshot, ahead, elapsed = result
+            self.log(f"🔎 {len(snapshot)} arquivos verificados em {elapsed:.0f} ms")
+            if not changed and not ahead:
+                self.log("✅ Nada mudou desde a última atualização - nada a fazer")
+                return
+            if not changed:
+                self.log("ℹ️ Sem mudanças nos arquivos, só enviando commits pendentes")
+            queue_update(commands if changed else commands[-1:], lambda job: save_snapshot(folder, snapshot))
+            
+        self.run_in_background(check, decide)
+        
+    def toggle_watch(self):
+        """Liga/desliga o auto-commit e push quando a pasta do projeto muda"""
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
+            self.watch_btn.config(text="👁️ INICIAR WATCH")
+            self.log("👁️ Watch parado")
+            return
+            
+        folder = self.folder_var.get().strip()
+        if not folder or not os.path.isdir(os.path.join(folder, '.git')):
+            messagebox.showerror("Erro", "Selecione (na aba Novo Projeto) a pasta de um repositório git!")
+            return
+        try:
+            quiet = max(1, int(self.watch_quiet_var.get()))
+        except (tk.TclError, ValueError):
+            quiet = WATCH_QUIET_SECONDS
+        msg = self.update_msg_var.get().strip() or "Atualização"
+        self.config['watch_quiet'] = quiet
+        self.save_config()
+        
+        key = os.path.normcase(os.path.abspath(folder))
+        
+        def run_update(job):
+            result = update_repository(folder, f"{msg} (auto {time.strftime('%d/%m %H:%M:%S')})",
+                                       cancel_event=job.cancel_event)
+            if result['status'] == 'cancelado':
+                return False
+            if result['status'] == 'falhou':
+                job.log(f"❌ Watch: {result['detail']}")
+                return False
+            job.log(f"👁️ Watch: {result['status']} ({result['seconds']:.1f}s)")
+            return True
+            
+        def on_change():
+            # Roda na thread do watcher: vira um job da fila; mudanças durante ele viram o próximo ciclo
+            if self.job_queue.busy(key):
+                self.log("👁️ Mudanças detectadas, aguardando o job atual deste repositório terminar...")
+                return False
+            self.log("👁️ Mudanças detectadas - atualizando...")
+            self.job_queue.submit(key, f"{os.path.basename(folder)}: watch", run_update,
+                                  JOB_PRIORITIES['Baixa'], log=self.log)
+            return True
+            
+        self.watcher = FolderWatcher(folder, on_change, quiet, log=self.log)
+        self.watcher.start()
+        self.watch_btn.config(text="⏹️ PARAR WATCH")
+        
+    def select_clone_dest(self):
+        """Escolhe onde clonar: pasta escolhida + nome do repositório"""
+        folder = filedialog.askdirectory()
+        if folder:
+            name = os.path.basename(self.clone_url_var.get().strip().rstrip('/'))
+            if name.endswith('.git'):
+                name = name[:-len('.git')]
+            self.clone_dest_var.set(os.path.join(folder, name) if name else folder)
+            
+    def start_clone(self):
+        """Coloca o clone na fila"""
+        repo = self.clone_url_var.get().strip()
+        dest = self.clone_dest_var.get().strip()
+        if not repo or not dest:
+            messagebox.showerror("Erro", "Informe a URL e a pasta de destino!")
+            return
+        try:
+            depth = int(self.clone_depth_var.get())
+        except (tk.TclError, ValueError):
+            depth = 0
+        sparse = [path.strip().strip('/') for path in self.clone_sparse_var.get().split(',') if path.strip()]
+        options = {'blobless': self.clone_blobless_var.get(), 'depth': depth or None, 'sparse_paths': sparse}
+        compare = self.clone_compare_var.get()
+        
+        self.config['clone_url'] = repo
+        self.config['clone_dest'] = dest
+        self.config['clone_blobless'] = options['blobless']
+        self.config['clone_depth'] = depth
+        self.config['clone_sparse'] = self.clone_sparse_var.get().strip()
+        self.save_config()
+        
+        title = f"clone: {os.path.basename(dest)}"
+        job = self.job_queue.submit(
+            os.path.normcase(os.path.abspath(dest)), title,
+            lambda job: self.run_clone(job, repo, dest, options, compare),
+            JOB_PRIORITIES.get(self.priority_var.get(), JOB_PRIORITIES['Normal']), log=self.log)
+        self.log(f"📥 J{job.id} na fila: {title}")
+        
+    def run_clone(self, job, repo, dest, options, compare):
+        """Executa o clone (thread do agendador) e compara com o clone completo"""
+        job.log("=" * 50)
+        job.log(f"📥 Clonando {repo} em {dest}")
+        logged = {}
+        
+        def progress(phase, percent):
+            self.run_in_ui(self.show_transfer_progress, phase, percent)
+            # No log: uma linha a cada 25% de cada fase
+            if percent // 25 > logged.get(phase, -1):
+                logged[phase] = percent // 25
+                job.log(f"   {phase}: {percent}%")
+                
+        try:
+            result = clone_repository(repo, dest, on_progress=progress, cancel_event=job.cancel_event, **options)
+        except CommandCancelled:
+            job.log("⏹️ Clone cancelado (pasta parcial removida)")
+            return False
+        except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+            job.detail = str(e)
+            job.log(f"❌ {e}")
+            return False
+        for command in result['commands']:
+            job.log(f"✓ {command}")
+        for warning in result['warnings']:
+            job.log(f"⚠️ {warning}")
+        if result['transfer']['phases']:
+            job.log(f"📊 {format_transfer_metrics(result['transfer'])}")
+            
+        reference = load_clone_reference(repo)
+        if compare:
+            job.log("⏱️ Medindo o clone completo para comparar...")
+            try:
+                reference = measure_full_clone(repo, job.cancel_event)
+            except CommandCancelled:
+                return False
+            except (OSError, RuntimeError, subprocess.TimeoutExpired) as e:
+                job.log(f"⚠️ Clone completo não medido: {e}")
+        job.log(f"✅ Clone pronto: {format_clone_savings(result, reference)}")
+        self.run_in_ui(self.transfer_var.set, f"Clone: {result['seconds']:.1f}s, {format_size(result['disk_bytes'])}")
+        return True
+        
+    def select_batch_root(self):
+        """Seleciona a pasta raiz da atualização em lote"""
+        folder = filedialog.askdirectory()
+        if folder:
+            self.batch_root_var.set(folder)
+            self.scan_batch_root()
+            
+    def scan_batch_root(self):
+        """Preenche a lista com os repositórios encontrados na pasta raiz"""
+        root = self.batch_root_var.get().strip()
+        if not root or not os.path.isdir(root):
+            messagebox.showerror("Erro", "Selecione uma pasta raiz válida!")
+            return
+        repos = find_repositories(root)
+        self.batch_text.delete('1.0', 'end')
+        self.batch_text.insert('1.0', '\n'.join(repos))
+        self.log(f"🔎 {len(repos)} repositório(s) encontrado(s) em {root}")
+        
+    def start_batch_update(self):
+        """Coloca a atualização de cada repositório da lista na fila (em paralelo, um job por repositório)"""
+        folders = [line.strip() for line in self.batch_text.get('1.0', 'end').splitlines() if line.strip()]
+        if not folders:
+            messagebox.showerror("Erro", "Informe os repositórios ou busque em uma pasta raiz!")
+            return
+        msg = self.update_msg_var.get().strip() or "Atualização"
+        try:
+            workers = int(self.batch_workers_var.get())
+        except (tk.TclError, ValueError):
+            workers = BATCH_WORKERS
+            
+        self.config['batch_root'] = self.batch_root_var.get().strip()
+        self.config['batch_repos'] = folders
+        self.config['batch_workers'] = workers
+        self.save_config()
+        
+        self.batch_tree.delete(*self.batch_tree.get_children())
+        self.log("=" * 50)
+        self.log(f"📦 Atualizando {len(folders)} repositório(s), {workers} em paralelo...")
         
-        self.execute_commands(commands, "✅ PROJETO ATUALIZADO!")
+        def show_result(result):
+            icon = {'enviado': '✅', 'nada para commitar': '➖'}.get(result['status'], '❌')
+            detail = result['detail'].splitlines()[0] if result['detail'] else ''
+            self.batch_tree.insert('', 'end', values=(result['repo'], f"{icon} {result['status']}",
+                                                      f"{result['seconds']:.1f}s", detail))
+            
+        start = time.time()
+        results = []
+        results_lock = threading.Lock()
+        
+        def run(job, folder):
+            result = update_repository(folder, msg, cancel_event=job.cancel_event)
+            self.run_in_ui(show_result, result)
+            if result['status'] == 'falhou':
+                job.detail = result['detail'].splitlines()[0] if result['detail'] else ''
+                job.log(f"❌ {folder}: {result['detail']}")
+            with results_lock:
+                results.append(result)
+                finished = len(results) == len(folders)
+            if finished:
+                counts = {}
+                for item in results:
+                    counts[item['status']] = counts.get(item['status'], 0) + 1
+                summary = ', '.join(f"{count} {status}" for status, count in counts.items())
+                self.log(f"📦 Lote concluído em {time.time() - start:.1f}s: {summary}")
+            return result['status'] not in ('falhou', 'cancelado')
+            
+        priority = JOB_PRIORITIES.get(self.priority_var.get(), JOB_PRIORITIES['Normal'])
+        for folder in folders:
+            self.job_queue.submit(os.path.normcase(os.path.abspath(folder)),
+                                  f"{os.path.basename(os.path.abspath(folder))}: lote",
+                                  lambda job, folder=folder: run(job, folder), priority, log=self.log,
+                                  group='lote', group_limit=workers)
         
     def save_git_config(self):
         """Salva config Git"""
@@ -627,70 +4645,134 @@ AGORA FUNCIONA 100% GARANTIDO!"""
         self.config['git_email'] = email
         self.save_config()
         
-        commands = [
-            f'git config --global user.name "{name}"',
-            f'git config --global user.email "{email}"',
-            'git config --global url."https://github.com/".insteadOf git@github.com:',
-            'git config --list | grep user'
-        ]
+        commands = build_git_config_commands(name, email)
         
-        self.execute_commands(commands, "⚙️ CONFIGURAÇÃO GIT SALVA E HTTPS CONFIGURADO!")
+        self.execute_commands(commands, "⚙️ CONFIGURAÇÃO GIT SALVA E HTTPS CONFIGURADO!", needs_folder=False)
         
     def fix_configure_https(self):
         """Configura Git para usar HTTPS"""
-        commands = [
-            'git config --global url."https://github.com/".insteadOf git@github.com:',
-            'git config --global --list | grep url',
-            'echo "Git configurado para usar HTTPS!"'
-        ]
-        self.execute_commands(commands, "🔒 HTTPS configurado com sucesso!")
+        self.run_fix('https')
+        
+    def run_fix(self, name):
+        """Executa uma das correções de FIX_COMMANDS"""
+        commands, success_msg, _ = FIX_COMMANDS[name]
+        # Só o HTTPS é global; as outras mexem no repositório da pasta
+        self.execute_commands(commands, success_msg, needs_folder=name != 'https')
         
     def fix_remove_origin(self):
         """Remove origin"""
-        commands = [
-            'git remote remove origin',
-            'git remote -v',
-            'echo "Origin removido! Pronto para novo repositório."'
-        ]
-        self.execute_commands(commands, "🗑️ Origin removido!")
+        self.run_fix('remove-origin')
         
     def fix_undo_commit(self):
         """Desfaz commit"""
-        commands = [
-            'git reset --soft HEAD~1',
-            'git status'
-        ]
-        self.execute_commands(commands, "↩️ Último commit desfeito!")
+        self.run_fix('undo-commit')
+        
+    def fix_optimize(self):
+        """Mede status/add, aplica manutenção e ajustes de escala e mede de novo (na fila)"""
+        folder = self.folder_var.get().strip()
+        if not folder or not os.path.exists(os.path.join(folder, '.git')):
+            messagebox.showerror("Erro", "Selecione um repositório git na aba Novo Projeto!")
+            return
+            
+        def run(job):
+            job.log("=" * 50)
+            job.log(f"🚀 Otimizando {folder}: medindo git status e git add -n ...")
+            before = benchmark_repo(folder, cancel_event=job.cancel_event)
+            for name, ok, detail in tune_repository(folder, cancel_event=job.cancel_event):
+                job.log(f"   {'✓' if ok else '⚠️'} {name}" + (f" ({detail})" if detail else ""))
+            after = benchmark_repo(folder, cancel_event=job.cancel_event)
+            for line in format_speedup(before, after).splitlines():
+                job.log(f"⏱️ {line}")
+            job.log("✅ Otimização aplicada (botão 'Desfazer Otimização' volta as configurações anteriores)")
+            return True
+            
+        job = self.job_queue.submit(os.path.normcase(os.path.abspath(folder)),
+                                    f"{os.path.basename(os.path.abspath(folder))}: otimizar", run,
+                                    JOB_PRIORITIES.get(self.priority_var.get(), JOB_PRIORITIES['Normal']),
+                                    log=self.log)
+        self.log(f"📥 J{job.id} na fila: otimizar")
+        
+    def fix_revert_optimize(self):
+        """Volta as configurações alteradas pelo Otimizar"""
+        folder = self.folder_var.get().strip()
+        if not folder or not os.path.exists(os.path.join(folder, '.git')):
+            messagebox.showerror("Erro", "Selecione um repositório git na aba Novo Projeto!")
+            return
+        if not os.path.exists(tuning_backup_path(folder)):
+            messagebox.showerror("Erro", "Nenhuma otimização registrada neste repositório")
+            return
+            
+        def run(job):
+            # Regrava o índice inteiro: na fila, junto dos outros jobs do repositório, e fora da thread da interface
+            job.log(f"↩️ Desfazendo a otimização de {folder}...")
+            try:
+                steps = revert_tuning(folder, cancel_event=job.cancel_event)
+            except CommandCancelled:
+                raise
+            except (OSError, RuntimeError) as e:
+                job.log(f"❌ {e}")
+                return False
+            for name, ok, detail in steps:
+                job.log(f"   {'✓' if ok else '❌'} {name}" + (f" ({detail})" if detail else ""))
+            job.log("↩️ Otimização desfeita")
+            return all(ok for _, ok, _ in steps)
+            
+        job = self.job_queue.submit(os.path.normcase(os.path.abspath(folder)),
+                                    f"{os.path.basename(os.path.abspath(folder))}: desfazer otimização", run,
+                                    JOB_PRIORITIES.get(self.priority_var.get(), JOB_PRIORITIES['Normal']),
+                                    log=self.log)
+        self.log(f"📥 J{job.id} na fila: desfazer otimização")
         
     def fix_status(self):
-        """Ver status completo"""
-        commands = [
-            'pwd',
-            'git status',
-            'git remote -v',
-            'git branch -a',
-            'git log --oneline -5'
-        ]
-        self.execute_commands(commands, "📊 Status verificado!")
+        """Ver status completo (lido direto do .git, atualiza sozinho)"""
+        folder = self.folder_var.get().strip()
+        if not folder:
+            messagebox.showerror("Erro", "Selecione a pasta do projeto na aba Novo Projeto!")
+            return
+        try:
+            reader = get_repo_reader(folder)
+        except RuntimeError as e:
+            messagebox.showerror("Erro", str(e))
+            return
+            
+        window = tk.Toplevel(self.root)
+        window.title("Status do Repositório")
+        window.geometry("700x450")
+        text = scrolledtext.ScrolledText(window, bg='black', fg='#00ff00', font=('Consolas', 9))
+        text.pack(fill='both', expand=True)
+        footer = tk.Label(window, anchor='w')
+        footer.pack(fill='x')
+        shown = {'status': None}
+        
+        def refresh():
+            if not window.winfo_exists():
+                return
+            start = time.perf_counter()
+            try:
+                status = reader.status()
+            except Exception as e:
+                status = None
+                footer.config(text=f"❌ {e}")
+            elapsed = (time.perf_counter() - start) * 1000
+            if status is not None and status is not shown['status']:
+                shown['status'] = status
+                text.delete('1.0', 'end')
+                text.insert('1.0', format_repo_status(status))
+                footer.config(text=f"Lido do .git em {elapsed:.1f} ms - atualiza ao vivo")
+            window.after(STATUS_REFRESH_MS, refresh)
+            
+        refresh()
+        self.log("📊 Status verificado!")
         
     def fix_reset(self):
         """Reset hard"""
         if messagebox.askyesno("⚠️ CUIDADO!", "Isso apagará TODAS as mudanças não commitadas!\nTem certeza?"):
-            commands = [
-                'git reset --hard HEAD',
-                'git clean -fd',
-                'git status'
-            ]
-            self.execute_commands(commands, "🔄 Reset executado!")
+            self.run_fix('reset')
             
     def fix_force_push(self):
         """Força push"""
         if messagebox.askyesno("⚠️ FORÇA PUSH!", "Isso pode sobrescrever o histórico remoto!\nTem certeza?"):
-            commands = [
-                'git push --force-with-lease origin main',
-                'echo "Push forçado concluído!"'
-            ]
-            self.execute_commands(commands, "💪 Push forçado executado!")
+            self.run_fix('force-push')
             
     def run_custom(self):
         """Executa comando personalizado"""
@@ -700,15 +4782,30 @@ AGORA FUNCIONA 100% GARANTIDO!"""
         else:
             messagebox.showerror("Erro", "Digite um comando!")
             
-    def run(self):
+    def report_startup_time(self):
+        """Mostra o tempo até a primeira janela (--startup-time)"""
+        elapsed = (time.perf_counter() - STARTUP_T0) * 1000
+        gui_loaded = 'sim' if pyautogui is not None else 'não'
+        msg = f"⏱️ Primeira janela em {elapsed:.0f} ms ({len(sys.modules)} módulos, pyautogui carregado: {gui_loaded})"
+        print(msg)
+        self.log(msg)
+        
+    def run(self, startup_time=False):
         """Inicia aplicação"""
+        if startup_time:
+            self.root.after_idle(self.report_startup_time)
         self.root.mainloop()
+        self.config.flush()
 
 # EXECUTAR
 if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_ACTIONS:
+        sys.exit(cli_main(sys.argv[1:]))
     print("=" * 70)
     print("Git Automatizador Pro v3.2 - PROBLEMAS CORRIGIDOS")
     print("✅ Remote origin, SSH/HTTPS e push corrigidos!")
     print("=" * 70)
+    # --startup-time: mede o tempo até a primeira janela
+    # (para detalhar os imports: python -X importtime GITPILOT_ALTO.py)
     app = GitAutomator()
-    app.run()
+    app.run(startup_time='--startup-time' in sys.argv)